@@ -0,0 +1 @@
+"""Lets ``pytest`` run from the repository root import ``navigation``."""
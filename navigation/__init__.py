@@ -0,0 +1,48 @@
+"""Headless planning core for the AI-Navigator simulations.
+
+Nothing in this package imports tkinter, so the planners can run inside a
+service or a batch job; run1.py and run2.py are thin views on top of it.
+"""
+from .grid import Grid
+from .planner import Planner
+from .dstar_lite import DStarLitePlanner
+from .flat_astar import FlatAStarPlanner
+from .ara import ARAStarPlanner
+from .landmarks import ALTPlanner, Landmarks
+from .anyangle import OctileAStarPlanner, ThetaStarPlanner
+from .hybrid import HybridAStarPlanner
+from .jps import JPSPlanner, JPSPlusPlanner
+from .bidirectional import BidirectionalAStarPlanner
+from .hpa import HPAPlanner
+from .flowfield import FlowField, FlowFieldPlanner
+from .spacetime import ObstaclePredictor, SpaceTimeAStarPlanner
+from .tour import TourPlanner
+from .motion import MOTION_MODELS, ObstacleMotion
+from .navigator import ARRIVED, MOVED, WAITING, Navigator
+
+PLANNERS = {
+    "astar": Planner,
+    "dstar_lite": DStarLitePlanner,
+    "flat_astar": FlatAStarPlanner,
+    "ara": ARAStarPlanner,
+    "alt": ALTPlanner,
+    "octile": OctileAStarPlanner,
+    "theta": ThetaStarPlanner,
+    "hybrid": HybridAStarPlanner,
+    "jps": JPSPlanner,
+    "jps_plus": JPSPlusPlanner,
+    "bidirectional": BidirectionalAStarPlanner,
+    "hpa": HPAPlanner,
+    "spacetime": SpaceTimeAStarPlanner,
+    "flow_field": FlowFieldPlanner,
+    "tour": TourPlanner,
+}
+
+
+def make_planner(name, grid, **options):
+    """Build the planner registered under ``name`` for ``grid``."""
+    try:
+        cls = PLANNERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown planner {name!r}; choose from {sorted(PLANNERS)}") from None
+    return cls(grid, **options)
@@ -0,0 +1,232 @@
+"""8-connected A* and any-angle Theta* (Nash, Daniel, Koenig & Felner).
+
+Both planners work on the padded flat-index mirror of the chart kept by
+FlatAStarPlanner. Diagonal moves cost sqrt(2) and may not cut the corner of
+a blocked cell; Theta* may also join any two cells in line of sight, and
+its routes are drawn back onto the grid as 8-connected cells so the
+Navigator can follow them one cell per tick.
+"""
+import heapq
+import math
+
+from .flat_astar import FlatAStarPlanner, _zeros
+
+SQRT2 = math.sqrt(2)
+
+# Line-of-sight results kept before the cache is simply dropped.
+LOS_CACHE_LIMIT = 1 << 20
+
+
+class OctileAStarPlanner(FlatAStarPlanner):
+    """A* over 8-connected moves with the octile distance as heuristic."""
+
+    def __init__(self, grid):
+        super().__init__(grid)
+        width = self.width
+        self.g = _zeros("d", self.size)
+        self.straight = (-width, width, -1, 1)
+        # (offset, the two cells it passes between)
+        self.diagonal = tuple((dr * width + dc, dr * width, dc)
+                              for dr in (-1, 1) for dc in (-1, 1))
+
+    def heuristic(self, a, b):
+        dr, dc = abs(a[0] - b[0]), abs(a[1] - b[1])
+        return dr + dc + (SQRT2 - 2) * min(dr, dc)
+
+    def _moves(self, u):
+        """(neighbour, step cost) of every move out of flat index ``u``."""
+        blocked = self.blocked
+        for off in self.straight:
+            if not blocked[u + off]:
+                yield u + off, 1.0
+        for off, side_a, side_b in self.diagonal:
+            if not (blocked[u + off] or blocked[u + side_a] or blocked[u + side_b]):
+                yield u + off, SQRT2
+
+    def find_path(self, start, goal=None):
+        goal = self.grid.goal if goal is None else goal
+        width = self.width
+        g, parent, seen, closed = self.g, self.parent, self.seen, self.closed
+        sid = self._next_search()
+        s, t = self.index(start), self.index(goal)
+        gr, gc = divmod(t, width)
+        g[s], parent[s], seen[s] = 0.0, -1, sid
+        heap = [(self.heuristic(start, goal), 0.0, s)]
+        expanded = 0
+
+        while heap:
+            _, _, u = heapq.heappop(heap)
+            if closed[u] == sid:
+                continue
+            if u == t:
+                self.expanded, self.frontier = expanded, len(heap)
+                return self._unwind(t)
+            closed[u] = sid
+            expanded += 1
+            for v, step in self._moves(u):
+                cost = g[u] + step
+                if seen[v] == sid and g[v] <= cost:
+                    continue
+                g[v], parent[v], seen[v] = cost, u, sid
+                vr, vc = divmod(v, width)
+                dr, dc = abs(vr - gr), abs(vc - gc)
+                heapq.heappush(heap, (cost + dr + dc + (SQRT2 - 2) * min(dr, dc), -cost, v))
+        self.expanded, self.frontier = expanded, 0
+        return None
+
+
+class ThetaStarPlanner(OctileAStarPlanner):
+    """Any-angle A*: a node's parent may be any cell it can see.
+
+    When a move from ``u`` reaches ``v``, ``v`` is linked straight to
+    ``u``'s parent if the two are in line of sight, so routes run along
+    true straight lines instead of 45-degree staircases. With ``lazy=True``
+    (Lazy Theta*) the sight line is assumed on generation and only checked
+    when ``v`` is expanded, which skips the check for nodes never expanded.
+
+    Line of sight walks the supercover of the segment between cell centres
+    (every cell it touches, and both cells where it passes exactly through a
+    corner) over the padded blocked mirror; results are cached per pair of
+    cells until the chart changes. After a search ``waypoints`` holds the
+    turning points of the route, while ``find_path`` returns every cell.
+    """
+
+    def __init__(self, grid, lazy=False):
+        super().__init__(grid)
+        self.lazy = lazy
+        self.waypoints = None
+        self._sight = {}
+
+    def _on_change(self, cells):
+        super()._on_change(cells)
+        self._sight.clear()
+
+    def heuristic(self, a, b):
+        return math.hypot(a[0] - b[0], a[1] - b[1])
+
+    def line_of_sight(self, a, b):
+        """True if the segment between flat indices ``a`` and ``b`` stays in open water.
+
+        The end cells themselves are not checked: the search only asks about
+        open cells and the ship's own, which in run1 order an obstacle may
+        have drifted onto.
+        """
+        key = (a, b) if a < b else (b, a)
+        clear = self._sight.get(key)
+        if clear is None:
+            if len(self._sight) >= LOS_CACHE_LIMIT:
+                self._sight.clear()
+            clear = self._sight[key] = self._walk(*key)
+        return clear
+
+    def _walk(self, a, b, cells=None):
+        # With a ``cells`` list, every index stepped onto is appended to it;
+        # through an exact corner that is the diagonal cell, both sides free.
+        blocked, width = self.blocked, self.width
+        ar, ac = divmod(a, width)
+        br, bc = divmod(b, width)
+        nr, nc = abs(br - ar), abs(bc - ac)
+        sr = width if br > ar else -width
+        sc = 1 if bc > ac else -1
+        v, ir, ic = a, 0, 0
+        while ir < nr or ic < nc:
+            # Compare where the segment next crosses a column and a row edge.
+            decision = (1 + 2 * ic) * nr - (1 + 2 * ir) * nc
+            if decision == 0:
+                if blocked[v + sr] or blocked[v + sc]:
+                    return False
+                v += sr + sc
+                ir += 1
+                ic += 1
+            elif decision < 0:
+                v += sc
+                ic += 1
+            else:
+                v += sr
+                ir += 1
+            if blocked[v] and v != b:
+                return False
+            if cells is not None:
+                cells.append(v)
+        return True
+
+    def _distance(self, a, b):
+        width = self.width
+        ar, ac = divmod(a, width)
+        br, bc = divmod(b, width)
+        return math.hypot(ar - br, ac - bc)
+
+    def find_path(self, start, goal=None):
+        goal = self.grid.goal if goal is None else goal
+        width, lazy = self.width, self.lazy
+        g, parent, seen, closed = self.g, self.parent, self.seen, self.closed
+        sight, distance = self.line_of_sight, self._distance
+        sid = self._next_search()
+        s, t = self.index(start), self.index(goal)
+        gr, gc = divmod(t, width)
+        g[s], parent[s], seen[s] = 0.0, -1, sid
+        heap = [(self.heuristic(start, goal), 0.0, s)]
+        expanded = 0
+        self.waypoints = None
+
+        while heap:
+            _, _, u = heapq.heappop(heap)
+            if closed[u] == sid:
+                continue
+            if lazy and parent[u] != -1 and not sight(parent[u], u):
+                # The assumed sight line is blocked: fall back to the best
+                # expanded neighbour, which includes the one that generated
+                # u unless that was a blocked start. With none, leave u to
+                # be generated again rather than expand it unreachable.
+                best, via = math.inf, -1
+                for w, step in self._moves(u):
+                    if closed[w] == sid and g[w] + step < best:
+                        best, via = g[w] + step, w
+                if via == -1:
+                    seen[u] = 0
+                    continue
+                g[u], parent[u] = best, via
+            if u == t:
+                self.expanded, self.frontier = expanded, len(heap)
+                self.waypoints = self._unwind(t)
+                return self._densify(self.waypoints)
+            closed[u] = sid
+            expanded += 1
+            p = parent[u]
+            for v, step in self._moves(u):
+                if closed[v] == sid:
+                    continue
+                if p != -1 and (lazy or sight(p, v)):
+                    via, cost = p, g[p] + distance(p, v)
+                else:
+                    via, cost = u, g[u] + step
+                if seen[v] == sid and g[v] <= cost:
+                    continue
+                g[v], parent[v], seen[v] = cost, via, sid
+                vr, vc = divmod(v, width)
+                heapq.heappush(heap, (cost + math.hypot(vr - gr, vc - gc), -cost, v))
+        self.expanded, self.frontier = expanded, 0
+        return None
+
+    def _densify(self, waypoints):
+        """Every cell of the route: each leg drawn as an 8-connected line.
+
+        Each leg contributes the cells its line-of-sight walk stepped onto,
+        all known free. The walk turns a corner in two straight steps; the
+        corner cell is dropped wherever the diagonal between its neighbours
+        passes no blocked cell, so routes never clip a corner.
+        """
+        blocked, width = self.blocked, self.width
+        walked = [self.index(waypoints[0])]
+        for a, b in zip(waypoints, waypoints[1:]):
+            self._walk(self.index(a), self.index(b), walked)
+        diagonals = (width - 1, width + 1)
+        path = walked[:2]
+        for v in walked[2:]:
+            w, u = path[-2], path[-1]
+            # u and w + v - u are the two cells the diagonal w -> v passes.
+            if abs(v - w) in diagonals and not blocked[w + v - u]:
+                path[-1] = v
+            else:
+                path.append(v)
+        return [self.cell(v) for v in path]
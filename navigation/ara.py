@@ -0,0 +1,163 @@
+"""Anytime Repairing A* (Likhachev, Gordon & Thrun, 2003)."""
+import heapq
+import math
+import time
+
+from .flat_astar import FlatAStarPlanner
+
+
+class ARAStarPlanner(FlatAStarPlanner):
+    """A* that returns a bounded-suboptimal path fast, then improves it.
+
+    The first search inflates the heuristic by ``epsilon``, which finds a
+    path at most ``epsilon`` times longer than optimal while expanding far
+    fewer nodes. Each later round lowers the inflation by ``step`` and
+    repairs the previous search instead of starting over: g-values and
+    parents are kept, and only the open list plus the nodes whose g dropped
+    after they were expanded (INCONS) are re-queued. Rounds stop at
+    ``epsilon`` 1 (optimal) or when ``budget_ms`` has passed since the call,
+    whichever comes first.
+
+    The budget binds the first round too: if it runs out before the goal is
+    reached, the call returns the route to the open node with the lowest f,
+    and the Navigator replans from along it on the next tick. Until a call
+    reaches the goal again, searches for that goal run as Real-Time Adaptive
+    A* (Koenig & Likhachev, 2006): plain A* whose expanded nodes learn the
+    estimate ``f(best) - g`` when it runs out of time, so a ship cannot
+    circle forever in a dead end of a static chart.
+
+    After each call ``self.epsilon`` is the suboptimality bound actually
+    proven for the returned path (``inf`` for a partial route, or one found
+    on learned estimates, which moving obstacles can make too high) and
+    ``self.rounds`` the number of searches.
+    """
+
+    def __init__(self, grid, epsilon=3.0, step=0.5, budget_ms=100):
+        super().__init__(grid)
+        self.initial_epsilon = epsilon
+        self.step = step
+        self.budget_ms = budget_ms
+        self.epsilon = epsilon
+        self.rounds = 0
+        # Estimates learned since a call last ran out of time, for _goal.
+        self._learned = None
+        self._goal = None
+
+    def find_path(self, start, goal=None):
+        goal = self.grid.goal if goal is None else goal
+        deadline = None if self.budget_ms is None else time.perf_counter() + self.budget_ms / 1000
+        width = self.width
+        g, parent, seen = self.g, self.parent, self.seen
+        sid = self._next_search()
+        s, t = self.index(start), self.index(goal)
+        gr, gc = divmod(t, width)
+
+        def h(v):
+            vr, vc = divmod(v, width)
+            return abs(vr - gr) + abs(vc - gc)
+
+        if goal != self._goal:
+            self._goal, self._learned = goal, None
+        learned = self._learned
+        if learned is not None:
+            def h(v, manhattan=h, get=learned.get):
+                known = get(v)
+                return manhattan(v) if known is None else known
+
+        g[s], parent[s], seen[s] = 0, -1, sid
+        eps = self.initial_epsilon if learned is None else 1.0
+        trail = None if learned is None else []
+        bound = math.inf
+        queued = {s}
+        self.expanded = self.rounds = 0
+        while True:
+            self.rounds += 1
+            # Heap entries are (f, -g, index); an entry is stale once g[index]
+            # has dropped below the g it was queued with.
+            open_ = [(g[v] + eps * h(v), -g[v], v) for v in queued]
+            heapq.heapify(open_)
+            incons, done = self._improve(open_, t, eps, sid, deadline, h, trail)
+            if seen[t] != sid:
+                self.frontier = len(open_)
+                if done:
+                    return None
+                best = self._most_promising(open_, h)
+                if learned is None:
+                    # The inflated round's g-values do not support learning;
+                    # the next call searches un-inflated and learns from it.
+                    self._learned = {}
+                else:
+                    f = g[best] + h(best)
+                    for v in trail:
+                        learned[v] = f - g[v]
+                self.epsilon = math.inf
+                return self._unwind(best)
+            queued = {v for _, neg, v in open_ if -neg == g[v]} | incons
+            # No path is shorter than the smallest un-inflated f among the
+            # nodes still to be looked at.
+            lower = min((g[v] + h(v) for v in queued), default=g[t])
+            if done:
+                bound = min(eps, g[t] / lower) if lower else 1.0
+            if bound <= 1 or not done or (deadline and time.perf_counter() >= deadline):
+                break
+            # Rounds at an inflation above the bound already proven would
+            # expand nothing.
+            eps = max(1.0, min(eps, bound) - self.step)
+        path = self._unwind(t)
+        # Parents improve after g(goal) was set, so the path may be shorter.
+        self.epsilon = min(bound, (len(path) - 1) / lower) if lower else 1.0
+        if learned:
+            self.epsilon = math.inf
+        self._learned = None
+        self.frontier = len(queued)
+        return path
+
+    def _most_promising(self, open_, h):
+        """Open node with the lowest un-inflated f, nearest the goal on ties."""
+        g = self.g
+        best, key = None, None
+        for _, neg, v in open_:
+            if -neg == g[v] and (key is None or (g[v] + h(v), h(v)) < key):
+                best, key = v, (g[v] + h(v), h(v))
+        return best
+
+    def _improve(self, open_, t, eps, sid, deadline, h, trail=None):
+        """One ARA* round; returns the INCONS set and whether the round finished.
+
+        Gives up past ``deadline``, leaving the open list as it stood. Every
+        node expanded is appended to ``trail``, if given.
+        """
+        blocked, offsets = self.blocked, self.offsets
+        g, parent, seen, closed = self.g, self.parent, self.seen, self.closed
+        # Closed marks use a fresh id per round, drawn from the same counter
+        # as ``sid`` so the two never collide.
+        rid = self._next_search()
+        incons = set()
+        expanded = 0
+        while open_:
+            f, neg, u = open_[0]
+            if -neg != g[u] or closed[u] == rid:
+                heapq.heappop(open_)
+                continue
+            if seen[t] == sid and g[t] <= f:
+                break
+            if deadline and expanded & 255 == 255 and time.perf_counter() >= deadline:
+                self.expanded += expanded
+                return incons, False
+            heapq.heappop(open_)
+            closed[u] = rid
+            expanded += 1
+            if trail is not None:
+                trail.append(u)
+            cost = g[u] + 1
+            for off in offsets:
+                v = u + off
+                if blocked[v] or (seen[v] == sid and g[v] <= cost):
+                    continue
+                g[v], parent[v], seen[v] = cost, u, sid
+                if closed[v] == rid:
+                    incons.add(v)
+                else:
+                    heapq.heappush(open_, (cost + eps * h(v), -cost, v))
+        self.expanded += expanded
+        return incons, True
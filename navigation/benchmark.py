@@ -0,0 +1,264 @@
+"""Planner benchmarks.
+
+    python -m navigation.benchmark --charts clutter maze --sizes 100 1000 --json now.json
+    python -m navigation.benchmark --baseline main.json flat_astar jps
+
+Every chart is generated from a seed, so runs on different machines or
+commits time ``find_path`` on identical input. Each row reports the cold
+first call (planner construction excluded), p50/p99/max over warm repeats,
+nodes expanded and the peak memory traced while building the planner and
+running its first search.
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from . import Grid, make_planner
+from .sweep import percentile
+
+# Benchmark name -> (registered planner, options).
+VARIANTS = {
+    "astar": ("astar", {}),
+    "dstar_lite": ("dstar_lite", {}),
+    "flat_astar": ("flat_astar", {}),
+    "ara": ("ara", {}),
+    "alt": ("alt", {}),
+    "octile": ("octile", {}),
+    "theta": ("theta", {}),
+    "lazy_theta": ("theta", {"lazy": True}),
+    "hybrid": ("hybrid", {}),
+    "jps": ("jps", {}),
+    "jps8": ("jps", {"diagonal": True}),
+    "jps_plus": ("jps_plus", {}),
+    "bidirectional": ("bidirectional", {}),
+    "hpa": ("hpa", {}),
+    "spacetime": ("spacetime", {}),
+    "flow_field": ("flow_field", {}),
+}
+
+# Variants that find shortest 4-connected paths, so their lengths must agree.
+# 8-connected and any-angle variants return paths of other lengths.
+EXACT = {"astar", "dstar_lite", "flat_astar", "alt", "jps", "jps_plus", "bidirectional", "spacetime",
+         "flow_field"}
+
+# Largest chart (in cells) each variant is run on unless --no-limits is given;
+# tuple-keyed planners need hundreds of bytes per cell, hybrid a closed byte
+# per cell and heading, and D* Lite's first search settles most of the
+# start-goal box (about 50 s at 2000x2000).
+LIMITS = {"astar": 1000 ** 2, "dstar_lite": 2000 ** 2, "jps": 1000 ** 2, "hybrid": 1000 ** 2}
+
+# Below this many repeats the nearest-rank p99 is simply the slowest run, so
+# it is left out (None) rather than passed off as a tail latency.
+P99_SAMPLES = 100
+
+
+def open_water(size, rng):
+    return np.zeros((size, size), dtype=bool)
+
+
+def clutter(size, rng, density=0.1):
+    """Targets scattered independently over ``density`` of the chart."""
+    return rng.random((size, size)) < density
+
+
+def channels(size, rng, spacing=8, gaps=2):
+    """Walls across the chart every ``spacing`` rows, each with a few one-cell gaps."""
+    mask = np.zeros((size, size), dtype=bool)
+    for r in range(spacing // 2, size, spacing):
+        mask[r] = True
+        mask[r, rng.integers(0, size, gaps)] = False
+    return mask
+
+
+def maze(size, rng):
+    """Depth-first maze: rooms on even cells joined by long winding corridors.
+
+    Built with a Python stack (about 2 s per million rooms), so the 4000^2
+    chart takes a while to generate.
+    """
+    n = (size + 1) // 2
+    rand = random.Random(int(rng.integers(2 ** 32)))
+    visited = bytearray(n * n)
+    visited[0] = 1
+    stack = [0]
+    doors = []
+    while stack:
+        room = stack[-1]
+        r, c = divmod(room, n)
+        options = []
+        if r > 0 and not visited[room - n]:
+            options.append(room - n)
+        if r < n - 1 and not visited[room + n]:
+            options.append(room + n)
+        if c > 0 and not visited[room - 1]:
+            options.append(room - 1)
+        if c < n - 1 and not visited[room + 1]:
+            options.append(room + 1)
+        if not options:
+            stack.pop()
+            continue
+        nxt = rand.choice(options)
+        visited[nxt] = 1
+        stack.append(nxt)
+        doors.append((room, nxt))
+    mask = np.ones((size, size), dtype=bool)
+    mask[::2, ::2] = False
+    if doors:
+        a, b = np.array(doors).T
+        mask[a // n + b // n, a % n + b % n] = False
+    if size % 2 == 0:
+        # The corner is not a room on even sizes; open it onto the nearest one.
+        mask[-2:, -1] = False
+    return mask
+
+
+CHARTS = {"open": open_water, "channels": channels, "clutter": clutter, "maze": maze}
+
+
+def make_chart(kind, size, seed=0):
+    """Reproducible corner-to-corner problem: ``(grid, start, goal)``."""
+    start, goal = (0, 0), (size - 1, size - 1)
+    mask = CHARTS[kind](size, np.random.default_rng(seed))
+    mask[start] = mask[goal] = False
+    return Grid.from_mask(mask, goal=goal), start, goal
+
+
+def time_planner(name, grid, start, goal, repeats=5):
+    """Time ``find_path`` for one variant and return a row of results."""
+    planner_name, options = VARIANTS[name]
+    # Memory is traced on a separate instance: tracing slows allocation.
+    tracemalloc.start()
+    make_planner(planner_name, grid, **options).find_path(start, goal)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    planner = make_planner(planner_name, grid, **options)
+    began = time.perf_counter()
+    path = planner.find_path(start, goal)
+    first = time.perf_counter() - began
+    expanded = planner.expanded
+
+    times = []
+    for _ in range(repeats):
+        began = time.perf_counter()
+        planner.find_path(start, goal)
+        times.append(time.perf_counter() - began)
+    times.sort()
+    return {
+        "planner": name,
+        "first_ms": first * 1000,
+        "p50_ms": percentile(times, 50) * 1000,
+        "p99_ms": percentile(times, 99) * 1000 if len(times) >= P99_SAMPLES else None,
+        "max_ms": times[-1] * 1000 if times else None,
+        "mean_ms": statistics.fmean(times) * 1000,
+        "expanded": expanded,
+        "peak_mb": peak / 2 ** 20,
+        "length": len(path) if path else None,
+    }
+
+
+def run_suite(planners, charts, sizes, seed=0, repeats=5, limits=True, log=None):
+    rows = []
+    for kind in charts:
+        for size in sizes:
+            grid, start, goal = make_chart(kind, size, seed)
+            for name in planners:
+                if limits and size * size > LIMITS.get(name, float("inf")):
+                    continue
+                row = {"chart": kind, "size": size, "seed": seed,
+                       **time_planner(name, grid, start, goal, repeats)}
+                rows.append(row)
+                if log:
+                    log(row)
+    return rows
+
+
+def compare(rows, baseline, tolerance, noise_ms=0.5):
+    """Rows whose search changed, or whose p50 grew by more than ``tolerance``.
+
+    Slowdowns under ``noise_ms`` are ignored: sub-millisecond timings jitter
+    by more than any sensible tolerance.
+    """
+    key = lambda row: (row["chart"], row["size"], row["seed"], row["planner"])
+    before = {key(row): row for row in baseline}
+    regressions = []
+    for row in rows:
+        old = before.get(key(row))
+        if old is None:
+            continue
+        slower = (row["p50_ms"] > old["p50_ms"] * (1 + tolerance) and
+                  row["p50_ms"] - old["p50_ms"] > noise_ms)
+        changed = row["expanded"] != old["expanded"] or row["length"] != old["length"]
+        if slower or changed:
+            regressions.append((row, old))
+    return regressions
+
+
+def _print_row(row):
+    p99 = "-" if row["p99_ms"] is None else f"{row['p99_ms']:.1f}"
+    print(f"{row['chart']:<10}{row['size']:>6}  {row['planner']:<15}{row['first_ms']:>10.1f}"
+          f"{row['p50_ms']:>10.1f}{p99:>10}{row['max_ms']:>10.1f}{row['expanded']:>11}"
+          f"{row['peak_mb']:>9.1f}{str(row['length']):>9}", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("planners", nargs="*", default=["astar", "flat_astar", "bidirectional"],
+                        metavar="PLANNER", help=f"any of {', '.join(VARIANTS)}")
+    parser.add_argument("--charts", nargs="+", default=["clutter"], choices=sorted(CHARTS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[300])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=5,
+                        help=f"warm runs per row; p99 needs at least {P99_SAMPLES} (default 5)")
+    parser.add_argument("--no-limits", dest="limits", action="store_false",
+                        help="run slow planners on charts of any size")
+    parser.add_argument("--json", metavar="FILE", help="write the results as JSON")
+    parser.add_argument("--baseline", metavar="FILE", help="compare against an earlier --json file")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed p50 slowdown against the baseline (default 0.2 = 20%%)")
+    parser.add_argument("--noise-ms", type=float, default=0.5,
+                        help="ignore p50 slowdowns smaller than this (default 0.5)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.planners if name not in VARIANTS]
+    if unknown:
+        parser.error(f"unknown planner(s) {', '.join(unknown)}; choose from {', '.join(VARIANTS)}")
+
+    print(f"{'chart':<10}{'size':>6}  {'planner':<15}{'first ms':>10}{'p50 ms':>10}{'p99 ms':>10}"
+          f"{'max ms':>10}{'expanded':>11}{'peak MB':>9}{'length':>9}")
+    rows = run_suite(args.planners, args.charts, args.sizes, args.seed, args.repeats,
+                     args.limits, log=_print_row)
+    if args.repeats < P99_SAMPLES:
+        print(f"p99 needs --repeats {P99_SAMPLES} or more; with {args.repeats} it would only be the max")
+    for kind in args.charts:
+        for size in args.sizes:
+            lengths = {row["length"] for row in rows
+                       if row["chart"] == kind and row["size"] == size and row["planner"] in EXACT}
+            if len(lengths) > 1:
+                print(f"warning: exact planners disagree on path length on {kind} {size}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "argv": sys.argv[1:] if argv is None else argv, "results": rows}, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(rows, json.load(f)["results"], args.tolerance, args.noise_ms)
+        for row, old in regressions:
+            print(f"regression: {row['chart']} {row['size']} {row['planner']}: "
+                  f"p50 {old['p50_ms']:.1f} -> {row['p50_ms']:.1f} ms, "
+                  f"expanded {old['expanded']} -> {row['expanded']}, "
+                  f"length {old['length']} -> {row['length']}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
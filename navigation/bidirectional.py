@@ -0,0 +1,106 @@
+"""Bidirectional A*: search from both ends and meet in the middle."""
+import heapq
+
+from .flat_astar import FlatAStarPlanner, _zeros
+
+
+class BidirectionalAStarPlanner(FlatAStarPlanner):
+    """Flat-index A* run forwards from the start and backwards from the goal.
+
+    Each side uses its own Manhattan heuristic (towards the far end) and the
+    side with the smaller open list is expanded next. ``mu`` is the cost of
+    the best start-goal path seen through any cell reached by both sides;
+    the search stops once either open list's smallest f reaches ``mu``, since
+    no cheaper path can remain (each f is a lower bound on every path through
+    that frontier). The returned path therefore has optimal length.
+    """
+
+    def __init__(self, grid):
+        super().__init__(grid)
+        self.g_back = _zeros("I", self.size)
+        self.parent_back = _zeros("i", self.size)
+        self.seen_back = _zeros("I", self.size)
+        self.closed_back = _zeros("I", self.size)
+
+    def _next_search(self):
+        sid = super()._next_search()
+        if sid == 1:
+            self.seen_back = _zeros("I", self.size)
+            self.closed_back = _zeros("I", self.size)
+        return sid
+
+    def find_path(self, start, goal=None):
+        goal = self.grid.goal if goal is None else goal
+        size, width = self.size, self.width
+        size2 = size * size
+        blocked, offsets = self.blocked, self.offsets
+        sid = self._next_search()
+        s, t = self.index(start), self.index(goal)
+        self.expanded = self.frontier = 0
+        if s == t:
+            return [start]
+        if blocked[t]:
+            return None
+        sr, sc = divmod(s, width)
+        tr, tc = divmod(t, width)
+        h0 = abs(sr - tr) + abs(sc - tc)
+
+        # Per side: g, parent, seen, closed, heap, far end row/col.
+        fwd = [self.g, self.parent, self.seen, self.closed, [h0 * size2 + (size - 1) * size + s], tr, tc]
+        bwd = [self.g_back, self.parent_back, self.seen_back, self.closed_back,
+               [h0 * size2 + (size - 1) * size + t], sr, sc]
+        for side, root in ((fwd, s), (bwd, t)):
+            g, parent, seen = side[0], side[1], side[2]
+            g[root], parent[root], seen[root] = 0, -1, sid
+
+        mu, meet = None, -1
+        while fwd[4] and bwd[4]:
+            top_f = self._top(fwd, sid)
+            top_b = self._top(bwd, sid)
+            if top_f is None or top_b is None:
+                break
+            if mu is not None and (top_f // size2 >= mu or top_b // size2 >= mu):
+                break
+            side, other = (fwd, bwd) if len(fwd[4]) <= len(bwd[4]) else (bwd, fwd)
+            g, parent, seen, closed, heap, er, ec = side
+            og, oseen = other[0], other[2]
+            u = heapq.heappop(heap) % size
+            closed[u] = sid
+            self.expanded += 1
+            cost = g[u] + 1
+            for off in offsets:
+                v = u + off
+                # Backwards, stepping onto v means the ship leaves v, so only
+                # the start may be blocked (an obstacle drifted onto the ship).
+                if blocked[v] and (side is fwd or v != s):
+                    continue
+                if seen[v] == sid and g[v] <= cost:
+                    continue
+                g[v], parent[v], seen[v] = cost, u, sid
+                vr, vc = divmod(v, width)
+                f = cost + abs(vr - er) + abs(vc - ec)
+                heapq.heappush(heap, (f * size + size - 1 - cost) * size + v)
+                if oseen[v] == sid and (mu is None or cost + og[v] < mu):
+                    mu, meet = cost + og[v], v
+        self.frontier = len(fwd[4]) + len(bwd[4])
+        if meet == -1:
+            return None
+        return self._join(meet)
+
+    def _top(self, side, sid):
+        """Smallest live heap key on one side, discarding closed entries."""
+        heap, closed, size = side[4], side[3], self.size
+        while heap:
+            if closed[heap[0] % size] != sid:
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def _join(self, meet):
+        head = self._unwind(meet)
+        parent = self.parent_back
+        index = parent[meet]
+        while index != -1:
+            head.append(self.cell(index))
+            index = parent[index]
+        return head
@@ -0,0 +1,142 @@
+"""A* over flat integer cell indices with preallocated buffers."""
+import heapq
+from array import array
+
+import numpy as np
+
+from .clearance import SCALE
+from .grid import BLOCKED
+from .planner import Planner
+
+
+def _zeros(typecode, n):
+    return array(typecode, bytes(array(typecode).itemsize * n))
+
+
+class FlatAStarPlanner(Planner):
+    """A* that encodes nodes as ``r * width + c`` ints.
+
+    The chart is mirrored into a byte array padded with a blocked border, so
+    neighbours are just ``index + offset`` from a fixed offset table with no
+    bounds checks. g-scores and parents live in flat arrays allocated once per
+    grid; a per-search stamp marks which entries are valid, so starting a new
+    search never clears them. Heap entries are single ints encoding
+    ``(f * size - g) * size + index``, so ties on f go to the deeper node.
+
+    With a ``clearance`` map, costs are counted in the map's integer units
+    (``SCALE`` per step plus the penalty of the cell entered) and the
+    Manhattan heuristic is scaled to match.
+    """
+
+    def __init__(self, grid, clearance=None):
+        super().__init__(grid, clearance)
+        self.width = grid.cols + 2
+        self.size = (grid.rows + 2) * self.width
+        self.offsets = (-self.width, self.width, -1, 1)
+        self._blocked = np.ones((grid.rows + 2, grid.cols + 2), dtype=np.uint8)
+        self._blocked[1:-1, 1:-1] = grid.cells & BLOCKED
+        self.blocked = memoryview(self._blocked.reshape(-1))
+        self.g = _zeros("I", self.size)
+        self.parent = _zeros("i", self.size)
+        self.seen = _zeros("I", self.size)
+        self.closed = _zeros("I", self.size)
+        self.search_id = 0
+        grid.add_watcher(self._on_change)
+
+    def _on_change(self, cells):
+        view = self.grid._view
+        for r, c in cells:
+            self._blocked[r + 1, c + 1] = view[r, c] & BLOCKED
+
+    def index(self, cell):
+        return (cell[0] + 1) * self.width + cell[1] + 1
+
+    def cell(self, index):
+        r, c = divmod(index, self.width)
+        return (r - 1, c - 1)
+
+    def _next_search(self):
+        self.search_id += 1
+        if self.search_id == 0xFFFFFFFF:
+            self.seen = _zeros("I", self.size)
+            self.closed = _zeros("I", self.size)
+            self.search_id = 1
+        return self.search_id
+
+    def find_path(self, start, goal=None):
+        goal = self.grid.goal if goal is None else goal
+        if self.clearance is not None:
+            return self._find_weighted(start, goal)
+        size, width = self.size, self.width
+        blocked, offsets = self.blocked, self.offsets
+        g, parent, seen, closed = self.g, self.parent, self.seen, self.closed
+        sid = self._next_search()
+        s, t = self.index(start), self.index(goal)
+        gr, gc = divmod(t, width)
+        sr, sc = divmod(s, width)
+        g[s], parent[s], seen[s] = 0, -1, sid
+        heap = [(abs(sr - gr) + abs(sc - gc)) * size * size + s]
+        expanded = 0
+
+        while heap:
+            u = heapq.heappop(heap) % size
+            if closed[u] == sid:
+                continue
+            if u == t:
+                self.expanded, self.frontier = expanded, len(heap)
+                return self._unwind(t)
+            closed[u] = sid
+            expanded += 1
+            cost = g[u] + 1
+            for off in offsets:
+                v = u + off
+                if blocked[v] or (seen[v] == sid and g[v] <= cost):
+                    continue
+                g[v], parent[v], seen[v] = cost, u, sid
+                vr, vc = divmod(v, width)
+                heapq.heappush(heap, ((cost + abs(vr - gr) + abs(vc - gc)) * size - cost) * size + v)
+        self.expanded, self.frontier = expanded, 0
+        return None
+
+    def _find_weighted(self, start, goal):
+        size, width = self.size, self.width
+        blocked, offsets, units = self.blocked, self.offsets, self.clearance.units
+        g, parent, seen, closed = self.g, self.parent, self.seen, self.closed
+        scale = SCALE
+        # Keys are (f * bound - g) * size + index; g never reaches ``bound``.
+        bound = size * self.clearance.max_units
+        sid = self._next_search()
+        s, t = self.index(start), self.index(goal)
+        gr, gc = divmod(t, width)
+        sr, sc = divmod(s, width)
+        g[s], parent[s], seen[s] = 0, -1, sid
+        heap = [(abs(sr - gr) + abs(sc - gc)) * scale * bound * size + s]
+        expanded = 0
+
+        while heap:
+            u = heapq.heappop(heap) % size
+            if closed[u] == sid:
+                continue
+            if u == t:
+                self.expanded, self.frontier = expanded, len(heap)
+                return self._unwind(t)
+            closed[u] = sid
+            expanded += 1
+            for off in offsets:
+                v = u + off
+                cost = g[u] + units[v]
+                if blocked[v] or (seen[v] == sid and g[v] <= cost):
+                    continue
+                g[v], parent[v], seen[v] = cost, u, sid
+                vr, vc = divmod(v, width)
+                heapq.heappush(heap, ((cost + (abs(vr - gr) + abs(vc - gc)) * scale) * bound - cost) * size + v)
+        self.expanded, self.frontier = expanded, 0
+        return None
+
+    def _unwind(self, index):
+        parent = self.parent
+        path = []
+        while index != -1:
+            path.append(self.cell(index))
+            index = parent[index]
+        return list(reversed(path))
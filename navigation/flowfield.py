@@ -0,0 +1,249 @@
+"""Goal-rooted flow field shared by any number of ships.
+
+    field = FlowField(grid)
+    nexts = field.next_moves(ships)          # (n, 2) array in, (n, 2) out
+    navs = [Navigator(grid, make_planner("flow_field", grid, field=field), ship)
+            for ship in ships]
+
+One breadth-first search from the goal gives every cell its distance to
+the goal; a ship anywhere on the chart steps to its neighbour with the
+smallest distance. When obstacles move, only the distances they affect are
+repaired, once per change however many ships read the field.
+"""
+import heapq
+
+import numpy as np
+
+from .grid import BLOCKED
+from .planner import Planner
+
+UNREACHABLE = 0xFFFFFFFF
+
+
+def wavefront(free, offsets, sources, out=None):
+    """Breadth-first step counts from ``sources`` over a flat padded chart.
+
+    ``free`` is a flat bool array that is False on blocked cells and on the
+    border, ``offsets`` the flat neighbour offsets and ``sources`` the flat
+    indices at distance 0 (they need not be free themselves). Returns (or
+    fills ``out`` with) uint32 distances, ``UNREACHABLE`` where no path
+    leads.
+    """
+    dist = np.empty(len(free), dtype=np.uint32) if out is None else out
+    dist.fill(UNREACHABLE)
+    frontier = np.unique(np.asarray(sources, dtype=np.intp))
+    dist[frontier] = 0
+    offsets = np.array(offsets)
+    d = 0
+    while frontier.size:
+        d += 1
+        ahead = (frontier[:, None] + offsets).ravel()
+        ahead = np.unique(ahead[free[ahead] & (dist[ahead] == UNREACHABLE)])
+        dist[ahead] = d
+        frontier = ahead
+    return dist
+
+
+class FlowField:
+    """Distance to ``goal`` for every cell, kept up to date as the chart changes.
+
+    Distances live in a flat uint32 array over the chart with a blocked
+    one-cell border, laid out like FlatAStarPlanner's nodes; blocked and
+    cut-off cells hold ``UNREACHABLE``. The field is built with a vectorised
+    wavefront. Changed cells are collected from the grid's watcher
+    callbacks and repaired on the next read: cells that lost every
+    neighbour one step closer to the goal are invalidated, then distances
+    are lowered again outward from the edge of that region and from freed
+    cells. ``repaired`` counts the cells the last rebuild or repair set,
+    and ``updates`` how many of those there have been.
+    """
+
+    def __init__(self, grid, goal=None):
+        self.grid = grid
+        self.width = grid.cols + 2
+        self.size = (grid.rows + 2) * self.width
+        self.offsets = (-self.width, self.width, -1, 1)
+        self._blocked = np.ones((grid.rows + 2, grid.cols + 2), dtype=np.uint8)
+        self._blocked[1:-1, 1:-1] = grid.cells & BLOCKED
+        self.blocked = memoryview(self._blocked.reshape(-1))
+        self._dist = np.full(self.size, UNREACHABLE, dtype=np.uint32)
+        self.dist = memoryview(self._dist)
+        self._changed = set()
+        self._goal = None
+        self.repaired = 0
+        self.updates = 0
+        self.goal = grid.goal if goal is None else goal
+        grid.add_watcher(self._on_change)
+
+    @property
+    def goal(self):
+        return self._goal
+
+    @goal.setter
+    def goal(self, cell):
+        if cell != self._goal:
+            self._goal = cell
+            self.rebuild()
+
+    def index(self, cell):
+        return (cell[0] + 1) * self.width + cell[1] + 1
+
+    def cell(self, index):
+        r, c = divmod(index, self.width)
+        return (r - 1, c - 1)
+
+    def _on_change(self, cells):
+        view = self.grid._view
+        for r, c in cells:
+            self._blocked[r + 1, c + 1] = view[r, c] & BLOCKED
+        self._changed.update(cells)
+
+    def rebuild(self):
+        """Recompute every distance with a breadth-first wavefront from the goal."""
+        self._changed.clear()
+        self.updates += 1
+        dist = self._dist
+        dist.fill(UNREACHABLE)
+        self.repaired = 0
+        if self._goal is None:
+            return
+        t = self.index(self._goal)
+        if self.blocked[t]:
+            return
+        wavefront(self._blocked.reshape(-1) == 0, self.offsets, [t], out=dist)
+        self.repaired = int((dist != UNREACHABLE).sum())
+
+    def sync(self):
+        """Apply the chart changes seen since the last read."""
+        if not self._changed:
+            return
+        # Past about one changed cell per 150, repairs cost more than the
+        # vectorised rebuild.
+        if (self._goal is None or self._goal in self._changed or
+                len(self._changed) * 150 > self.grid.rows * self.grid.cols):
+            self.rebuild()
+            return
+        changed, self._changed = self._changed, set()
+        t = self.index(self._goal)
+        blocked, dist, offsets = self.blocked, self.dist, self.offsets
+        # Invalidate: a cell keeps its distance only while some neighbour is
+        # one step closer, so the chain back to the goal still exists.
+        stack = []
+        freed = []
+        for cell in changed:
+            v = self.index(cell)
+            if blocked[v]:
+                if dist[v] != UNREACHABLE:
+                    dist[v] = UNREACHABLE
+                    stack.append(v)
+            else:
+                freed.append(v)
+        invalid = []
+        while stack:
+            v = stack.pop()
+            invalid.append(v)
+            for off in offsets:
+                w = v + off
+                d = dist[w]
+                if d == UNREACHABLE or w == t or blocked[w]:
+                    continue
+                for o in offsets:
+                    if dist[w + o] == d - 1:
+                        break
+                else:
+                    dist[w] = UNREACHABLE
+                    stack.append(w)
+        # Lower: reseed from the finite edge of the invalidated region and
+        # from freed cells, then relax outward in order of distance.
+        heap = []
+        for v in invalid + freed:
+            if blocked[v]:
+                continue
+            best = min(dist[v + o] for o in offsets)
+            if best != UNREACHABLE and best + 1 < dist[v]:
+                dist[v] = best + 1
+                heap.append((best + 1, v))
+        heapq.heapify(heap)
+        lowered = 0
+        while heap:
+            d, v = heapq.heappop(heap)
+            if d != dist[v]:
+                continue
+            lowered += 1
+            d += 1
+            for off in offsets:
+                w = v + off
+                if not blocked[w] and d < dist[w]:
+                    dist[w] = d
+                    heapq.heappush(heap, (d, w))
+        self.repaired = len(invalid) + lowered
+        self.updates += 1
+
+    def distance(self, cell):
+        """Steps from ``cell`` to the goal, or None if it cannot get there."""
+        self.sync()
+        d = self.dist[self.index(cell)]
+        return None if d == UNREACHABLE else d
+
+    def next_move(self, cell):
+        """The neighbour of ``cell`` one step closer to the goal, or None."""
+        self.sync()
+        v = self.index(cell)
+        if v == self.index(self._goal):
+            return None
+        dist = self.dist
+        best = min((v + o for o in self.offsets), key=dist.__getitem__)
+        if dist[best] == UNREACHABLE or (dist[v] != UNREACHABLE and dist[best] >= dist[v]):
+            return None
+        return self.cell(best)
+
+    def next_moves(self, cells):
+        """Next cell for each of ``cells`` ((n, 2) ints) at once.
+
+        Ships at the goal or cut off from it stay where they are.
+        """
+        self.sync()
+        cells = np.asarray(cells, dtype=np.intp).reshape(-1, 2)
+        here = (cells[:, 0] + 1) * self.width + cells[:, 1] + 1
+        around = here[:, None] + np.array(self.offsets)
+        reach = self._dist[around]
+        pick = reach.argmin(axis=1)
+        best = reach[np.arange(len(here)), pick]
+        move = (best != UNREACHABLE) & (best < self._dist[here])
+        target = np.where(move, around[np.arange(len(here)), pick], here)
+        return np.column_stack(np.divmod(target, self.width)) - 1
+
+    def path(self, start):
+        """Cells from ``start`` down the field to the goal, or None if cut off."""
+        self.sync()
+        if start == self._goal:
+            return [start]
+        path = [start]
+        cell = self.next_move(start)
+        while cell is not None:
+            path.append(cell)
+            cell = self.next_move(cell)
+        return path if path[-1] == self._goal else None
+
+
+class FlowFieldPlanner(Planner):
+    """Planner that reads routes off a (possibly shared) FlowField.
+
+    Ships heading to the same goal should share one ``field``; a call with
+    another goal re-roots the field and rebuilds it. ``expanded`` reports
+    the cells the field repaired for this call, zero when another ship
+    already brought it up to date.
+    """
+
+    def __init__(self, grid, field=None):
+        super().__init__(grid)
+        self.field = FlowField(grid) if field is None else field
+
+    def find_path(self, start, goal=None):
+        field = self.field
+        before = field.updates
+        field.goal = self.grid.goal if goal is None else goal
+        path = field.path(start)
+        self.expanded = field.repaired if field.updates != before else 0
+        self.frontier = 0
+        return path
@@ -0,0 +1,153 @@
+"""Grid world shared by the planners and the Tk front ends."""
+import random
+
+import numpy as np
+
+MOVES = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+# Bit flags stored per cell in Grid.cells.
+OBSTACLE = 1
+TARGET = 2
+GOAL = 4
+BLOCKED = OBSTACLE | TARGET
+
+
+class Grid:
+    """Rectangular chart with static targets and moving obstacles.
+
+    The world state lives in ``cells``, a uint8 array of bit flags, so
+    membership tests are O(1) and whole-grid updates are vectorised.
+    ``obstacles`` keeps their positions in order for moving them; they must
+    start on distinct cells. Targets never move, so ``targets`` is read off
+    ``cells`` on demand. Targets and obstacles both block the ship.
+    """
+
+    def __init__(self, rows, cols=None, goal=None, targets=(), obstacles=()):
+        self.rows = rows
+        self.cols = rows if cols is None else cols
+        self.cells = np.zeros((self.rows, self.cols), dtype=np.uint8)
+        # Python-level view on the same memory: much cheaper than numpy
+        # scalar indexing inside the planners' inner loops.
+        self._view = memoryview(self.cells)
+        self.obstacles = list(obstacles)
+        self._mark(list(targets), TARGET)
+        self._mark(self.obstacles, OBSTACLE)
+        self._goal = None
+        self.goal = goal
+        self.version = 0
+        self._watchers = []
+
+    @classmethod
+    def generate(cls, size, target_count, obstacle_count, start, goal, rng=random):
+        """Scatter targets and obstacles over every cell except start and goal."""
+        reserved = {start[0] * size + start[1], goal[0] * size + goal[1]}
+        picks = rng.sample(range(size * size), target_count + obstacle_count + len(reserved))
+        picks = [i for i in picks if i not in reserved][:target_count + obstacle_count]
+        cells = [divmod(i, size) for i in picks]
+        return cls(size, goal=goal, targets=cells[:target_count], obstacles=cells[target_count:])
+
+    @classmethod
+    def from_mask(cls, targets, goal=None, obstacles=()):
+        """Build a chart from a boolean (rows, cols) array marking the targets."""
+        rows, cols = targets.shape
+        grid = cls(rows, cols, goal=goal, obstacles=obstacles)
+        grid.cells[targets] |= TARGET
+        return grid
+
+    @property
+    def targets(self):
+        """Target cells in row-major order."""
+        return [tuple(cell) for cell in np.argwhere(self.cells & TARGET).tolist()]
+
+    @property
+    def goal(self):
+        return self._goal
+
+    @goal.setter
+    def goal(self, cell):
+        np.bitwise_and(self.cells, 0xFF ^ GOAL, out=self.cells)
+        self._goal = cell
+        if cell is not None:
+            self.cells[cell] |= GOAL
+
+    def _mark(self, cells, flag):
+        if cells:
+            rows, cols = np.array(cells, dtype=np.intp).T
+            self.cells[rows, cols] |= flag
+
+    def add_watcher(self, callback):
+        """Call ``callback(cells)`` whenever the listed cells change blocked state."""
+        self._watchers.append(callback)
+
+    def _notify(self, cells):
+        self.version += 1
+        for callback in self._watchers:
+            callback(cells)
+
+    def in_bounds(self, cell):
+        r, c = cell
+        return 0 <= r < self.rows and 0 <= c < self.cols
+
+    def is_free(self, cell):
+        return not self._view[cell] & BLOCKED
+
+    def blocked_mask(self):
+        """Boolean array that is True wherever the ship cannot go."""
+        return (self.cells & BLOCKED) != 0
+
+    def neighbors(self, cell):
+        r, c = cell
+        view = self._view
+        neighbors = []
+        for dr, dc in MOVES:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < self.rows and 0 <= nc < self.cols and not view[nr, nc] & BLOCKED:
+                neighbors.append((nr, nc))
+        return neighbors
+
+    def move_obstacles(self, avoid=(), rng=random):
+        """Step every obstacle to a random free neighbour, one obstacle at a time.
+
+        Obstacles never move onto a cell in ``avoid`` (typically the ship and
+        the goal) and, because each one sees the positions of those already
+        moved, two obstacles never end up sharing a cell. Returns the cells
+        that were vacated or newly occupied.
+        """
+        view = self._view
+        changed = []
+        for i, obs in enumerate(self.obstacles):
+            moves = [m for m in self.neighbors(obs) if m not in avoid]
+            if moves:
+                new = rng.choice(moves)
+                view[obs] &= 0xFF ^ OBSTACLE
+                view[new] |= OBSTACLE
+                self.obstacles[i] = new
+                changed += [obs, new]
+        if changed:
+            self._notify(changed)
+        return changed
+
+    def apply_moves(self, moves):
+        """Move obstacles all at once; ``moves`` holds (obstacle, row, col) rows.
+
+        Unlike ``move_obstacles`` the moves are simultaneous: every vacated
+        cell is cleared before any entered one is marked, so an obstacle may
+        enter a cell another leaves on the same tick, and two may swap. The
+        cells entered must differ from each other and from those of the
+        obstacles that stay. Returns the cells vacated or entered.
+        """
+        moves = np.asarray(moves, dtype=np.intp).reshape(-1, 3)
+        if not len(moves):
+            return []
+        index = moves[:, 0].tolist()
+        obstacles = self.obstacles
+        vacated = [obstacles[i] for i in index]
+        entered = list(map(tuple, moves[:, 1:].tolist()))
+        rows, cols = np.array(vacated, dtype=np.intp).T
+        self.cells[rows, cols] &= 0xFF ^ OBSTACLE
+        self.cells[moves[:, 1], moves[:, 2]] |= OBSTACLE
+        for i, cell in zip(index, entered):
+            obstacles[i] = cell
+        changed = vacated + entered
+        self._notify(changed)
+        return changed
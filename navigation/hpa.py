@@ -0,0 +1,247 @@
+"""Hierarchical path planning (HPA*, Botea, Müller & Schaeffer, 2004)."""
+import heapq
+from collections import deque
+
+import numpy as np
+
+from .grid import BLOCKED, MOVES
+from .planner import Planner
+
+# Entrances at least this wide get a transition at each end instead of one
+# in the middle, as in the original paper.
+WIDE_ENTRANCE = 6
+
+
+class HPAPlanner(Planner):
+    """Plan over an abstract graph of sector entrances, then refine the corridor.
+
+    The chart is cut into ``cluster_size`` square sectors. Every free run of
+    cells along a shared sector border is an entrance, and transition cells
+    on either side of it are joined by unit-cost inter-sector edges. Inside a
+    sector, transitions are joined by edges weighted with the exact
+    in-sector distance. Both kinds of edges are computed on first use and
+    cached, so opening a huge chart costs nothing up front (call ``build``
+    to precompute everything). When a cell changes, only the cached data of
+    the sector holding it is dropped, plus the border it lies on, if any.
+
+    Paths are valid but can be slightly longer than optimal, because they
+    are routed through transition cells.
+    """
+
+    def __init__(self, grid, cluster_size=16):
+        super().__init__(grid)
+        self.cluster_size = cluster_size
+        self.sector_rows = -(-grid.rows // cluster_size)
+        self.sector_cols = -(-grid.cols // cluster_size)
+        self._borders = {}
+        self._intra = {}
+        grid.add_watcher(self._on_change)
+
+    # -- sectors ---------------------------------------------------------
+
+    def sector(self, cell):
+        return (cell[0] // self.cluster_size, cell[1] // self.cluster_size)
+
+    def _bounds(self, sector):
+        size = self.cluster_size
+        r0, c0 = sector[0] * size, sector[1] * size
+        return r0, min(r0 + size, self.grid.rows), c0, min(c0 + size, self.grid.cols)
+
+    def _adjacent(self, sector):
+        sr, sc = sector
+        for dr, dc in MOVES:
+            if 0 <= sr + dr < self.sector_rows and 0 <= sc + dc < self.sector_cols:
+                yield (sr + dr, sc + dc)
+
+    def _on_change(self, cells):
+        for r, c in cells:
+            sector = self.sector((r, c))
+            self._intra.pop(sector, None)
+            r0, r1, c0, c1 = self._bounds(sector)
+            for other in self._adjacent(sector):
+                dr, dc = other[0] - sector[0], other[1] - sector[1]
+                on_edge = ((dr == -1 and r == r0) or (dr == 1 and r == r1 - 1) or
+                           (dc == -1 and c == c0) or (dc == 1 and c == c1 - 1))
+                if on_edge and self._borders.pop(_key(sector, other), None) is not None:
+                    self._intra.pop(other, None)
+
+    # -- abstract graph ----------------------------------------------------
+
+    def build(self):
+        """Precompute every entrance and intra-sector edge."""
+        for sr in range(self.sector_rows):
+            for sc in range(self.sector_cols):
+                self._intra_edges((sr, sc))
+
+    def _border(self, a, b):
+        """Map each transition cell on the a|b border to its partner across it."""
+        key = _key(a, b)
+        if key in self._borders:
+            return self._borders[key]
+        a, b = key
+        cells = self.grid.cells
+        ar0, ar1, ac0, ac1 = self._bounds(a)
+        if a[0] == b[0]:
+            # a is left of b: compare a's last column with b's first.
+            along = np.arange(ar0, ar1)
+            ok = ((cells[ar0:ar1, ac1 - 1] | cells[ar0:ar1, ac1]) & BLOCKED) == 0
+            pair = lambda i: ((int(i), ac1 - 1), (int(i), ac1))
+        else:
+            along = np.arange(ac0, ac1)
+            ok = ((cells[ar1 - 1, ac0:ac1] | cells[ar1, ac0:ac1]) & BLOCKED) == 0
+            pair = lambda i: ((ar1 - 1, int(i)), (ar1, int(i)))
+        links = {}
+        for lo, hi in _runs(ok):
+            if hi - lo >= WIDE_ENTRANCE:
+                picks = (along[lo], along[hi - 1])
+            else:
+                picks = (along[(lo + hi - 1) // 2],)
+            for i in picks:
+                x, y = pair(i)
+                links[x], links[y] = y, x
+        self._borders[key] = links
+        return links
+
+    def _nodes(self, sector):
+        nodes = set()
+        for other in self._adjacent(sector):
+            nodes.update(self._border(sector, other))
+        r0, r1, c0, c1 = self._bounds(sector)
+        return [n for n in nodes if r0 <= n[0] < r1 and c0 <= n[1] < c1]
+
+    def _intra_edges(self, sector):
+        if sector not in self._intra:
+            nodes = self._nodes(sector)
+            edges = {}
+            for node in nodes:
+                dist, _ = self._sector_search(node, sector)
+                edges[node] = {other: dist[other] for other in nodes
+                               if other != node and other in dist}
+            self._intra[sector] = edges
+        return self._intra[sector]
+
+    def _inter_edges(self, node):
+        sector = self.sector(node)
+        for other in self._adjacent(sector):
+            partner = self._border(sector, other).get(node)
+            if partner is not None:
+                yield partner
+
+    # -- search ----------------------------------------------------------
+
+    def _sector_search(self, source, sector, target=None):
+        """Breadth-first search from ``source`` without leaving ``sector``."""
+        r0, r1, c0, c1 = self._bounds(sector)
+        dist = {source: 0}
+        parent = {source: None}
+        queue = deque([source])
+        while queue:
+            cell = queue.popleft()
+            if cell == target:
+                break
+            r, c = cell
+            for dr, dc in MOVES:
+                nr, nc = r + dr, c + dc
+                nxt = (nr, nc)
+                if (r0 <= nr < r1 and c0 <= nc < c1 and nxt not in dist and
+                        self.grid.is_free(nxt)):
+                    dist[nxt] = dist[cell] + 1
+                    parent[nxt] = cell
+                    queue.append(nxt)
+        return dist, parent
+
+    def find_path(self, start, goal=None):
+        goal = self.grid.goal if goal is None else goal
+        self.expanded = self.frontier = 0
+        if start == goal:
+            return [start]
+        if not self.grid.is_free(goal):
+            return None
+        start_sector, goal_sector = self.sector(start), self.sector(goal)
+
+        start_edges = {}
+        sources = [(start, 0)]
+        if not self.grid.is_free(start):
+            # An obstacle drifted onto the ship, so no entrance runs through
+            # its cell; let it step straight into a neighbouring sector.
+            sources += [(n, 1) for n in self.grid.neighbors(start) if self.sector(n) != start_sector]
+        for source, offset in sources:
+            sector = self.sector(source)
+            dist, _ = self._sector_search(source, sector)
+            for n in self._nodes(sector) + [goal]:
+                if n in dist and dist[n] + offset < start_edges.get(n, float("inf")):
+                    start_edges[n] = dist[n] + offset
+        dist, _ = self._sector_search(goal, goal_sector)
+        to_goal = {n: dist[n] for n in self._nodes(goal_sector) if n in dist}
+
+        abstract = self._abstract_search(start, goal, start_edges, to_goal)
+        if abstract is None:
+            return None
+        return self._refine(abstract)
+
+    def _abstract_search(self, start, goal, start_edges, to_goal):
+        frontier = [(self.heuristic(start, goal), 0, 0, start)]
+        came_from = {start: None}
+        cost_so_far = {start: 0}
+        while frontier:
+            _, _, cost, current = heapq.heappop(frontier)
+            if current == goal:
+                self.frontier = len(frontier)
+                return self.reconstruct_path(came_from, goal)
+            if cost > cost_so_far[current]:
+                continue
+            self.expanded += 1
+            if current == start:
+                edges = list(start_edges.items())
+                edges += [(p, 1) for p in self._inter_edges(start)]
+            else:
+                edges = list(self._intra_edges(self.sector(current)).get(current, {}).items())
+                edges += [(p, 1) for p in self._inter_edges(current)]
+                if current in to_goal:
+                    edges.append((goal, to_goal[current]))
+            for neighbor, step in edges:
+                new_cost = cost + step
+                if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
+                    cost_so_far[neighbor] = new_cost
+                    came_from[neighbor] = current
+                    f = new_cost + self.heuristic(neighbor, goal)
+                    heapq.heappush(frontier, (f, -new_cost, new_cost, neighbor))
+        return None
+
+    def _refine(self, abstract):
+        path = [abstract[0]]
+        for a, b in zip(abstract, abstract[1:]):
+            if abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1:
+                path.append(b)
+                continue
+            if self.sector(a) != self.sector(b):
+                # Only the blocked-start shortcut crosses sectors in one edge:
+                # step into b's sector through the neighbour closest to b.
+                best = None
+                for n in self.grid.neighbors(a):
+                    if self.sector(n) == self.sector(b):
+                        dist, parent = self._sector_search(n, self.sector(n), target=b)
+                        if b in dist and (best is None or dist[b] < best[0]):
+                            best = (dist[b], n, parent)
+                _, a, parent = best
+                path.append(a)
+            else:
+                _, parent = self._sector_search(a, self.sector(a), target=b)
+            leg = []
+            cell = b
+            while cell != a:
+                leg.append(cell)
+                cell = parent[cell]
+            path.extend(reversed(leg))
+        return path
+
+
+def _key(a, b):
+    return (a, b) if a < b else (b, a)
+
+
+def _runs(mask):
+    """Yield (start, stop) index pairs of the True runs in a 1-D bool array."""
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return zip(edges[::2].tolist(), edges[1::2].tolist())
@@ -0,0 +1,316 @@
+"""Hybrid A* (Dolgov, Thrun, Montemerlo & Diebel) over (row, col, heading).
+
+The ship moves along motion primitives: a straight run or an arc at the
+turning radius, all of one arc length. Poses are continuous, but the
+closed set is discretised to (cell, heading bin), so the extra dimension
+multiplies the search by the number of headings rather than blowing it up.
+Routes are drawn back onto the grid as the cells the primitives sweep, so
+the Navigator follows them one cell per tick like any other route.
+"""
+import heapq
+import math
+
+import numpy as np
+
+from .flat_astar import FlatAStarPlanner
+from .flowfield import UNREACHABLE, wavefront
+
+# Largest gap between the points a primitive is checked at, in cells. Below
+# one, consecutive samples are at most one cell apart on each axis.
+SAMPLE_SPACING = 0.25
+
+# Tables shared by every planner with the same parameters; they depend on
+# nothing but (headings, step, window, reverse).
+_PRIMITIVES = {}
+_TABLES = {}
+
+
+def motion_primitives(headings, step, reverse=False):
+    """Primitives leaving each heading bin: straight, turn left, turn right.
+
+    Returns one tuple per heading of ``(gear, end heading, samples)``, where
+    ``gear`` is 1 ahead and -1 astern (only with ``reverse``) and
+    ``samples`` are the (drow, dcol) offsets from the start pose at which
+    the primitive is checked, ending at its end point. A turn changes the
+    heading by exactly one bin, so its radius is ``step * headings / 2pi``.
+    """
+    key = (headings, step, reverse)
+    if key in _PRIMITIVES:
+        return _PRIMITIVES[key]
+    turn = 2 * math.pi / headings
+    radius = step / turn
+    n = max(2, math.ceil(step / SAMPLE_SPACING))
+    table = []
+    for k in range(headings):
+        theta = k * turn
+        moves = []
+        for gear in ((1, -1) if reverse else (1,)):
+            for steer in (0, 1, -1):
+                samples = []
+                for j in range(1, n + 1):
+                    f = j / n
+                    if steer:
+                        psi = theta + steer * f * turn
+                        samples.append((gear * steer * radius * (math.cos(theta) - math.cos(psi)),
+                                        gear * steer * radius * (math.sin(psi) - math.sin(theta))))
+                    else:
+                        samples.append((gear * f * step * math.sin(theta),
+                                        gear * f * step * math.cos(theta)))
+                moves.append((gear, (k + steer) % headings, tuple(samples)))
+        table.append(tuple(moves))
+    _PRIMITIVES[key] = tuple(table)
+    return _PRIMITIVES[key]
+
+
+def crossed(r0, c0, r1, c1):
+    """Cells passed between two points in diagonally adjacent cells.
+
+    That is the side cell the segment enters on its way, or both side cells
+    when it runs exactly through the corner the four cells share.
+    """
+    a, b, e, f = math.floor(r0), math.floor(c0), math.floor(r1), math.floor(c1)
+    # How far along the segment it crosses the row edge and the column edge.
+    tr = (max(a, e) - r0) / (r1 - r0)
+    tc = (max(b, f) - c0) / (c1 - c0)
+    if tr < tc:
+        return ((e, b),)
+    if tc < tr:
+        return ((a, f),)
+    return ((e, b), (a, f))
+
+
+def primitive_table(headings, step, window, reverse=False):
+    """Fewest primitives from any pose in a cell to a cell up to ``window`` away.
+
+    Returns a uint16 array indexed ``[heading, drow + window, dcol + window]``.
+    The counts come from a breadth-first search over whole cells in which a
+    primitive may land in any cell its end point could reach from some
+    point of the start cell, so they never exceed the true count and
+    ``count * step`` is an admissible bound. Obstacles are ignored; 0 marks
+    offsets the search did not reach.
+    """
+    key = (headings, step, window, reverse)
+    if key in _TABLES:
+        return _TABLES[key]
+    primitives = motion_primitives(headings, step, reverse)
+    # Search a margin beyond the window so detours around the turning
+    # circles are not cut off by its edge.
+    margin = 2 * math.ceil(step * headings / (2 * math.pi)) + 2
+    reach = window + margin
+    side = 2 * reach + 1
+    lands = []
+    for k, moves in enumerate(primitives):
+        for _, end, samples in moves:
+            dr, dc = samples[-1]
+            shifts = {(a, b) for a in {math.floor(dr), math.floor(dr) + 1}
+                      for b in {math.floor(dc), math.floor(dc) + 1}}
+            lands.append((k, end, shifts))
+
+    # dist[source heading, heading, row, col]
+    never = np.iinfo(np.uint16).max
+    dist = np.full((headings, headings, side, side), never, dtype=np.uint16)
+    frontier = np.zeros(dist.shape, dtype=bool)
+    for k in range(headings):
+        frontier[k, k, reach, reach] = True
+    dist[frontier] = 0
+    d = 0
+    while frontier.any():
+        d += 1
+        ahead = np.zeros_like(frontier)
+        for k, end, shifts in lands:
+            here = frontier[:, k]
+            for a, b in shifts:
+                ahead[:, end, max(a, 0):side + min(a, 0), max(b, 0):side + min(b, 0)] |= \
+                    here[:, max(-a, 0):side - max(a, 0), max(-b, 0):side - max(b, 0)]
+        frontier = ahead & (dist == never)
+        dist[frontier] = d
+    best = dist.min(axis=1)[:, margin:margin + 2 * window + 1, margin:margin + 2 * window + 1]
+    table = np.where(best == never, 0, best).astype(np.uint16)
+    _TABLES[key] = table
+    return table
+
+
+class HybridAStarPlanner(FlatAStarPlanner):
+    """Kinematically feasible routes for a ship that cannot turn in place.
+
+    ``radius`` is the tightest turning radius and ``step`` the arc length
+    of one primitive, both in cells. The number of heading bins is the
+    smallest multiple of four for which a one-bin turn of length ``step``
+    is no tighter than ``radius``; ``headings`` and the resulting
+    ``turning_radius`` are kept on the planner. Going astern costs
+    ``reverse_cost`` times the distance covered; ``None`` keeps the ship
+    going ahead only, which can leave it boxed in facing a dead end.
+
+    Each (cell, heading bin) slot keeps the cheapest continuous pose found
+    for it, and a byte array of search stamps closes slots. The heuristic is
+    the largest of three admissible bounds: the precomputed primitive table
+    (within ``window`` cells of the goal), the straight-line distance from
+    the pose to the goal cell, and a king-move distance to the goal over
+    the current chart, less one cell since the pose may lie anywhere in
+    its cell. A search ends when a primitive ends in the goal cell,
+    at any heading.
+
+    A primitive is clear when every cell it sweeps is open water: the
+    cells of its samples and, where consecutive samples lie in diagonally
+    adjacent cells, the side cell the arc passes through (both, through an
+    exact corner), so arcs never squeeze between blocked cells that touch
+    at a corner. Routes step through that side cell unless both are free.
+
+    A ship starting on the last route it was given keeps that route's
+    heading; otherwise it may leave in any direction. ``poses`` holds the
+    (row, col, heading in radians) at the end of every primitive of the
+    last route.
+    """
+
+    # Routes bend to the turning circle, so they are rarely the shortest
+    # cell paths; freed water near them is no reason to replan.
+    replan_on_shortcut = False
+
+    def __init__(self, grid, radius=2.0, step=1.0, reverse_cost=2.0, window=16):
+        super().__init__(grid)
+        if reverse_cost is not None and reverse_cost < 1:
+            raise ValueError("reverse_cost below 1 would break the heuristic's bound")
+        self.step = step
+        self.reverse_cost = reverse_cost
+        reverse = reverse_cost is not None
+        self.headings = 4 * math.ceil(2 * math.pi * radius / step / 4)
+        self.turning_radius = step * self.headings / (2 * math.pi)
+        self.window = window
+        self.primitives = motion_primitives(self.headings, step, reverse)
+        self.table = memoryview(primitive_table(self.headings, step, window, reverse).reshape(-1))
+        self.slots = bytearray(self.size * self.headings)
+        self.stamp = 0
+        self.poses = None
+        self._heading = {}
+        self._bound = None
+        self._bound_key = None
+
+    def heuristic(self, a, b):
+        return math.hypot(a[0] - b[0], a[1] - b[1])
+
+    def _next_stamp(self):
+        self.stamp += 1
+        if self.stamp == 256:
+            self.slots = bytearray(self.size * self.headings)
+            self.stamp = 1
+        return self.stamp
+
+    def _king_moves(self, t):
+        key = (self.grid.version, t)
+        if key != self._bound_key:
+            w = self.width
+            kings = (-w - 1, -w, -w + 1, -1, 1, w - 1, w, w + 1)
+            free = self._blocked.reshape(-1) == 0
+            self._bound = memoryview(wavefront(free, kings, [t]))
+            self._bound_key = key
+        return self._bound
+
+    def find_path(self, start, goal=None):
+        goal = self.grid.goal if goal is None else goal
+        if start == goal:
+            self.poses = [(start[0] + 0.5, start[1] + 0.5, 0.0)]
+            return [start]
+        headings, width, step, window = self.headings, self.width, self.step, self.window
+        blocked, primitives, table = self.blocked, self.primitives, self.table
+        side = 2 * window + 1
+        slots = self.slots
+        stamp = self._next_stamp()
+        t = self.index(goal)
+        gr, gc = goal
+        kings = self._king_moves(t)
+
+        def bound(v, k, r, c):
+            h = kings[v]
+            if h == UNREACHABLE:
+                return math.inf
+            # Straight-line distance from the pose to the goal cell.
+            h = max(h - 1, math.hypot(max(gr - r, r - gr - 1, 0), max(gc - c, c - gc - 1, 0)))
+            dr, dc = gr - math.floor(r), gc - math.floor(c)
+            if -window <= dr <= window and -window <= dc <= window:
+                h = max(h, table[(k * side + dr + window) * side + dc + window] * step)
+            return h
+
+        # slot -> (g, row, col, heading, parent slot, primitive taken)
+        nodes = {}
+        heap = []
+        r0, c0 = start[0] + 0.5, start[1] + 0.5
+        s = self.index(start)
+        known = self._heading.get(start)
+        for k in (range(headings) if known is None else (known,)):
+            slot = s * headings + k
+            nodes[slot] = (0.0, r0, c0, k, -1, 0)
+            heap.append((bound(s, k, r0, c0), 0.0, slot))
+        heapq.heapify(heap)
+        ahead, astern = step, step * (self.reverse_cost or 1)
+        expanded = 0
+
+        while heap:
+            _, _, u = heapq.heappop(heap)
+            if slots[u] == stamp:
+                continue
+            g, r, c, k, _, _ = nodes[u]
+            if u // headings == t:
+                self.expanded, self.frontier = expanded, len(heap)
+                return self._unwind(nodes, u)
+            slots[u] = stamp
+            expanded += 1
+            row, col = math.floor(r), math.floor(c)
+            for move, (gear, end, samples) in enumerate(primitives[k]):
+                lr, lc, ldr, ldc = row, col, 0.0, 0.0
+                for dr, dc in samples:
+                    sr, sc = math.floor(r + dr), math.floor(c + dc)
+                    if blocked[(sr + 1) * width + sc + 1]:
+                        break
+                    if sr != lr and sc != lc and any(
+                            blocked[(br + 1) * width + bc + 1]
+                            for br, bc in crossed(r + ldr, c + ldc, r + dr, c + dc)):
+                        break
+                    lr, lc, ldr, ldc = sr, sc, dr, dc
+                else:
+                    nr, nc = r + dr, c + dc
+                    v = (math.floor(nr) + 1) * width + math.floor(nc) + 1
+                    slot = v * headings + end
+                    if slots[slot] == stamp:
+                        continue
+                    cost = g + (ahead if gear > 0 else astern)
+                    old = nodes.get(slot)
+                    if old is not None and old[0] <= cost:
+                        continue
+                    h = bound(v, end, nr, nc)
+                    if h == math.inf:
+                        continue
+                    nodes[slot] = (cost, nr, nc, end, u, move)
+                    heapq.heappush(heap, (cost + h, -cost, slot))
+        self.expanded, self.frontier = expanded, 0
+        return None
+
+    def _unwind(self, nodes, slot):
+        chain = []
+        while slot != -1:
+            chain.append(nodes[slot])
+            slot = chain[-1][4]
+        chain.reverse()
+        turn = 2 * math.pi / self.headings
+        _, r, c, k, _, _ = chain[0]
+        path = [(math.floor(r), math.floor(c))]
+        headings = {path[0]: k}
+        self.poses = [(r, c, k * turn)]
+        is_free = self.grid.is_free
+        for (_, r, c, k, _, _), (_, _, _, end, _, move) in zip(chain, chain[1:]):
+            ldr = ldc = 0.0
+            for dr, dc in self.primitives[k][move][2]:
+                cell = (math.floor(r + dr), math.floor(c + dc))
+                last = path[-1]
+                if cell != last:
+                    if cell[0] != last[0] and cell[1] != last[1]:
+                        # Keep the diagonal only where it clips no corner.
+                        side = crossed(r + ldr, c + ldc, r + dr, c + dc)[0]
+                        if not is_free((last[0] + cell[0] - side[0], last[1] + cell[1] - side[1])):
+                            path.append(side)
+                            headings.setdefault(side, end)
+                    path.append(cell)
+                    headings.setdefault(cell, end)
+                ldr, ldc = dr, dc
+            self.poses.append((r + dr, c + dc, end * turn))
+        self._heading = headings
+        return path
@@ -0,0 +1,266 @@
+"""Jump Point Search (Harabor & Grastien) and JPS+ for uniform-cost grids.
+
+Both planners work on the padded flat-index mirror of the chart kept by
+FlatAStarPlanner. Diagonal moves, when enabled, cost sqrt(2) and may not
+cut the corner of a blocked cell.
+"""
+import heapq
+import math
+
+import numpy as np
+
+from .flat_astar import FlatAStarPlanner
+
+SQRT2 = math.sqrt(2)
+
+STRAIGHT = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+DIAGONAL = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+
+def _sign(x):
+    return (x > 0) - (x < 0)
+
+
+class JPSPlanner(FlatAStarPlanner):
+    """A* that only expands jump points instead of every open-water cell.
+
+    With ``diagonal=False`` the ship moves 4-connected (JPS4: vertical jumps
+    also scan sideways); with ``diagonal=True`` it moves 8-connected.
+
+    Jumping pays on open water and long channels, where few cells are jump
+    points. On cluttered charts nearly every cell beside a target forces a
+    neighbour, so JPS4 expands several times more nodes than ``flat_astar``,
+    whose ties already favour the deepest node, and runs far slower (41k
+    against 4.9k expansions on the 300x300 benchmark clutter). Prefer
+    ``flat_astar`` there; JPS8 suffers less but still trails ``octile``.
+    """
+
+    def __init__(self, grid, diagonal=False):
+        super().__init__(grid)
+        self.diagonal = diagonal
+
+    def heuristic(self, a, b):
+        dr, dc = abs(a[0] - b[0]), abs(a[1] - b[1])
+        if self.diagonal:
+            return max(dr, dc) + (SQRT2 - 1) * min(dr, dc)
+        return dr + dc
+
+    def find_path(self, start, goal=None):
+        goal = self.grid.goal if goal is None else goal
+        width = self.width
+        s, t = self.index(start), self.index(goal)
+        g = {s: 0}
+        parent = {s: None}
+        heading = {s: None}
+        closed = set()
+        heap = [(self.heuristic(start, goal), 0, s)]
+        self._prepare()
+        self.expanded = self.frontier = 0
+
+        while heap:
+            _, _, u = heapq.heappop(heap)
+            if u in closed:
+                continue
+            if u == t:
+                self.frontier = len(heap)
+                return self._densify(parent, t)
+            closed.add(u)
+            self.expanded += 1
+            ur, uc = divmod(u, width)
+            for v in self._successors(u, heading[u], t):
+                vr, vc = divmod(v, width)
+                cost = g[u] + self.heuristic((ur, uc), (vr, vc))
+                if v not in g or cost < g[v]:
+                    g[v], parent[v] = cost, u
+                    heading[v] = (_sign(vr - ur), _sign(vc - uc))
+                    heapq.heappush(heap, (cost + self.heuristic((vr, vc), goal), -cost, v))
+        return None
+
+    def _prepare(self):
+        pass
+
+    def _directions(self, u, heading):
+        """Natural and forced directions out of ``u`` given how it was reached."""
+        blocked, width = self.blocked, self.width
+        if heading is None:
+            dirs = list(STRAIGHT)
+            if self.diagonal:
+                dirs += [(dr, dc) for dr, dc in DIAGONAL
+                         if not blocked[u + dr * width] and not blocked[u + dc]]
+            return dirs
+        dr, dc = heading
+        if not self.diagonal:
+            if dr:
+                return [(dr, 0), (0, -1), (0, 1)]
+            return [(0, dc), (-1, 0), (1, 0)]
+        if dr and dc:
+            dirs = [(dr, 0), (0, dc)]
+            if not blocked[u + dr * width] and not blocked[u + dc]:
+                dirs.append((dr, dc))
+            return dirs
+        dirs = [heading]
+        forward = not blocked[u + dr * width + dc]
+        # Perpendicular neighbours are the two cells beside the ship.
+        for pr, pc in ((dc, dr), (-dc, -dr)):
+            if not blocked[u + pr * width + pc]:
+                dirs.append((pr, pc))
+                if forward:
+                    dirs.append((dr + pr, dc + pc))
+        return dirs
+
+    def _successors(self, u, heading, t):
+        width = self.width
+        for dr, dc in self._directions(u, heading):
+            if dr and dc:
+                v = self._jump_diagonal(u + dr * width + dc, dr, dc, t)
+            else:
+                v = self._jump_straight(u + dr * width + dc, dr, dc, t)
+            if v != -1:
+                yield v
+
+    def _jump_straight(self, v, dr, dc, t):
+        blocked, width = self.blocked, self.width
+        step = dr * width + dc
+        # Cells on either side of the line, and the ones just behind them.
+        side_a = dc * width + dr
+        side_b = -side_a
+        while True:
+            if blocked[v]:
+                return -1
+            if v == t:
+                return v
+            if ((not blocked[v + side_a] and blocked[v + side_a - step]) or
+                    (not blocked[v + side_b] and blocked[v + side_b - step])):
+                return v
+            if dr and not self.diagonal:
+                if (self._jump_straight(v + 1, 0, 1, t) != -1 or
+                        self._jump_straight(v - 1, 0, -1, t) != -1):
+                    return v
+            v += step
+
+    def _jump_diagonal(self, v, dr, dc, t):
+        blocked, width = self.blocked, self.width
+        row_step = dr * width
+        while True:
+            if blocked[v]:
+                return -1
+            if v == t:
+                return v
+            if (self._jump_straight(v + dc, 0, dc, t) != -1 or
+                    self._jump_straight(v + row_step, dr, 0, t) != -1):
+                return v
+            if blocked[v + dc] or blocked[v + row_step]:
+                return -1
+            v += row_step + dc
+
+    def _densify(self, parent, t):
+        jump_points = []
+        while t is not None:
+            jump_points.append(self.cell(t))
+            t = parent[t]
+        jump_points.reverse()
+        path = jump_points[:1]
+        for (ar, ac), (br, bc) in zip(jump_points, jump_points[1:]):
+            dr, dc = _sign(br - ar), _sign(bc - ac)
+            for k in range(1, max(abs(br - ar), abs(bc - ac)) + 1):
+                path.append((ar + k * dr, ac + k * dc))
+        return path
+
+
+class JPSPlusPlanner(JPSPlanner):
+    """JPS with jump distances precomputed for every cell and direction.
+
+    The tables are rebuilt (vectorised, one row sweep per direction) the
+    first time the planner runs after the chart changes, so this mode pays
+    off on static layers; with obstacles moving every tick prefer ``jps``.
+    It expands the same jump points as ``jps``, so on cluttered charts it
+    trails ``flat_astar`` too.
+    Each entry is ``k > 0`` when a jump point lies k cells away, or ``-k``
+    when k free cells lead up to a wall.
+    """
+
+    def __init__(self, grid, diagonal=False):
+        super().__init__(grid, diagonal)
+        self.tables = None
+        self._built_version = None
+
+    def _prepare(self):
+        if self.tables is None or self._built_version != self.grid.version:
+            self.tables = self._build_tables()
+            self._built_version = self.grid.version
+
+    def _build_tables(self):
+        blocked = self._blocked.astype(bool)
+        free = ~blocked
+        straight = {}
+        # Horizontal tables first: 4-connected vertical jumps depend on them.
+        for dr, dc in [(0, -1), (0, 1), (-1, 0), (1, 0)]:
+            forced = np.zeros_like(blocked)
+            for pr, pc in ((dc, dr), (-dc, -dr)):
+                forced |= _shift(free, pr, pc) & _shift(blocked, pr - dr, pc - dc)
+            if dr and not self.diagonal:
+                forced |= (straight[(0, -1)] > 0) | (straight[(0, 1)] > 0)
+            straight[(dr, dc)] = _scan(blocked, forced, dr, dc)
+        tables = dict(straight)
+        if self.diagonal:
+            for dr, dc in DIAGONAL:
+                wall = blocked | _shift(blocked, -dr, 0) | _shift(blocked, 0, -dc)
+                jump = (straight[(dr, 0)] > 0) | (straight[(0, dc)] > 0)
+                tables[(dr, dc)] = _scan(wall, jump, dr, dc)
+        return {d: memoryview(table.reshape(-1)) for d, table in tables.items()}
+
+    def _successors(self, u, heading, t):
+        width = self.width
+        ur, uc = divmod(u, width)
+        tr, tc = divmod(t, width)
+        for dr, dc in self._directions(u, heading):
+            dist = self.tables[(dr, dc)][u]
+            reach = dist if dist > 0 else -dist
+            if dr and dc:
+                if _sign(tr - ur) == dr and _sign(tc - uc) == dc:
+                    # Stop where the goal's row or column is reached.
+                    m = min(abs(tr - ur), abs(tc - uc))
+                    if m <= reach:
+                        yield u + m * (dr * width + dc)
+                        continue
+            elif dr:
+                if _sign(tr - ur) == dr and abs(tr - ur) <= reach:
+                    if tc == uc or not self.diagonal:
+                        yield u + (tr - ur) * width
+                        continue
+            elif tr == ur and _sign(tc - uc) == dc and abs(tc - uc) <= reach:
+                yield t
+                continue
+            if dist > 0:
+                yield u + dist * (dr * width + dc)
+
+
+def _shift(mask, dr, dc):
+    """``out[r, c] = mask[r + dr, c + dc]``; the padded border absorbs wrap-around."""
+    return np.roll(mask, (-dr, -dc), axis=(0, 1))
+
+
+def _scan(wall, jump, dr, dc):
+    """Distance table for walking from each cell in direction (dr, dc).
+
+    ``wall[t]`` says the walk cannot step into t and ``jump[t]`` that t is a
+    jump point. Rows are swept so the cell one step ahead is always done.
+    """
+    if dr == 0:
+        return _scan(wall.T, jump.T, dc, 0).T.copy()
+    rows, cols = wall.shape
+    dist = np.zeros((rows, cols), dtype=np.int32)
+    order = range(rows) if dr < 0 else range(rows - 1, -1, -1)
+    for r in order:
+        ahead = r + dr
+        if not 0 <= ahead < rows:
+            continue
+        w, j, d = wall[ahead], jump[ahead], dist[ahead]
+        if dc:
+            w = np.roll(w, -dc)
+            j = np.roll(j, -dc)
+            d = np.roll(d, -dc)
+            edge = cols - 1 if dc > 0 else 0
+            w[edge] = True
+        dist[r] = np.where(w, 0, np.where(j, 1, np.where(d > 0, d + 1, d - 1)))
+    return dist
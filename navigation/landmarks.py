@@ -0,0 +1,165 @@
+"""Landmark (ALT) lower bounds for repeated queries on one chart.
+
+    landmarks = Landmarks(grid, count=8, path="port.alt.npy")
+    planner = make_planner("alt", grid, landmarks=landmarks)
+
+Manhattan distance knows nothing of coastlines, so A* floods every bay on
+the way to a goal behind a pier. Exact distances from a few landmarks give
+a far tighter bound: by the triangle inequality no route from v to t is
+shorter than ``|d(L, t) - d(L, v)|`` for any landmark L.
+"""
+import heapq
+import os
+
+import numpy as np
+
+from .flat_astar import FlatAStarPlanner
+from .flowfield import UNREACHABLE, wavefront
+from .grid import TARGET
+
+
+class Landmarks:
+    """Step counts from ``count`` landmarks to every cell of the static layer.
+
+    Only targets are charted: obstacles move, and blocking more cells can
+    only lengthen routes, so the bounds stay admissible (and consistent)
+    whatever the obstacles do. Landmarks are picked farthest-first, each as
+    far as possible from those already chosen. The table is one row per
+    landmark over FlatAStarPlanner's padded flat layout, as uint16 where
+    every distance fits and uint32 otherwise, with the dtype's largest
+    value marking cells a landmark cannot reach.
+
+    With a ``path`` the table is kept in a ``.npy`` file and read through a
+    memory map, so processes sharing a chart share the pages; the file is
+    reused while it matches the chart's targets and rebuilt when it does not.
+    """
+
+    def __init__(self, grid, count=8, path=None):
+        self.grid = grid
+        self.count = count
+        self.width = grid.cols + 2
+        self.size = (grid.rows + 2) * self.width
+        static = np.ones((grid.rows + 2, grid.cols + 2), dtype=np.uint8)
+        static[1:-1, 1:-1] = (grid.cells & TARGET) != 0
+        self.static = static.reshape(-1)
+        self.offsets = (-self.width, self.width, -1, 1)
+        self.table = self._load(path) if path and os.path.exists(path) else None
+        if self.table is None:
+            self.table = self._build(path)
+        self.none = np.iinfo(self.table.dtype).max
+        self.cells = [self.cell(int(v)) for v, row in zip(self.table.argmin(axis=1), self.table)
+                      if row[v] == 0]
+        self._goal = None
+        self._bounds = None
+
+    def cell(self, index):
+        r, c = divmod(index, self.width)
+        return (r - 1, c - 1)
+
+    def _load(self, path):
+        # Row 0 of the file holds the static layer it was built for.
+        table = np.load(path, mmap_mode="r")
+        if (table.ndim != 2 or table.shape != (self.count + 1, self.size) or
+                not np.array_equal(table[0], self.static)):
+            return None
+        return table[1:]
+
+    def _build(self, path):
+        free = self.static == 0
+        rows = []
+        cells = np.flatnonzero(free)
+        if len(cells):
+            # Seed from the cell farthest from an arbitrary one, then keep
+            # taking the cell farthest from every landmark so far.
+            nearest = wavefront(free, self.offsets, cells[:1]).astype(np.int64)
+            for _ in range(self.count):
+                reached = np.where(nearest == UNREACHABLE, -1, nearest)
+                row = wavefront(free, self.offsets, [int(reached.argmax())])
+                rows.append(row)
+                nearest = np.minimum(nearest, row)
+        while len(rows) < self.count:
+            rows.append(np.full(self.size, UNREACHABLE, dtype=np.uint32))
+        table = np.array(rows)
+        finite = table[table != UNREACHABLE]
+        if not len(finite) or finite.max() < 0xFFFF:
+            table = np.where(table == UNREACHABLE, 0xFFFF, table).astype(np.uint16)
+        if path is None:
+            return table
+        # Write beside the file and swap it in, so processes still mapping
+        # an older table keep reading the one they opened.
+        partial = path + ".part"
+        out = np.lib.format.open_memmap(partial, mode="w+", dtype=table.dtype,
+                                        shape=(self.count + 1, self.size))
+        out[0] = self.static
+        out[1:] = table
+        out.flush()
+        del out
+        os.replace(partial, path)
+        return np.load(path, mmap_mode="r")[1:]
+
+    def bounds(self, goal):
+        """Lower bound on the steps from every flat index to ``goal``.
+
+        The array (int32, one entry per padded index) is the larger of the
+        Manhattan distance and every landmark's triangle bound; it is kept
+        for the last goal asked about.
+        """
+        if goal == self._goal:
+            return self._bounds
+        t = (goal[0] + 1) * self.width + goal[1] + 1
+        r, c = np.divmod(np.arange(self.size, dtype=np.int32), self.width)
+        h = np.abs(r - (goal[0] + 1)) + np.abs(c - (goal[1] + 1))
+        for row in self.table:
+            dt = int(row[t])
+            if dt == self.none:
+                continue
+            d = row.astype(np.int32)
+            np.maximum(h, np.where(d == self.none, 0, np.abs(d - dt)), out=h)
+        self._goal, self._bounds = goal, h
+        return h
+
+
+class ALTPlanner(FlatAStarPlanner):
+    """Flat A* guided by landmark bounds instead of Manhattan distance.
+
+    Pass a shared ``landmarks`` table to reuse one precomputation across
+    planners; otherwise one is built for ``grid`` with ``count`` landmarks
+    (and kept at ``path``, if given). The bound for each goal is a single
+    vectorised pass over the table, after which every node costs one array
+    read. Routes are shortest paths, as with ``flat_astar``.
+    """
+
+    def __init__(self, grid, landmarks=None, count=8, path=None):
+        super().__init__(grid)
+        self.landmarks = Landmarks(grid, count, path) if landmarks is None else landmarks
+
+    def find_path(self, start, goal=None):
+        goal = self.grid.goal if goal is None else goal
+        size = self.size
+        blocked, offsets = self.blocked, self.offsets
+        g, parent, seen, closed = self.g, self.parent, self.seen, self.closed
+        h = memoryview(self.landmarks.bounds(goal))
+        sid = self._next_search()
+        s, t = self.index(start), self.index(goal)
+        g[s], parent[s], seen[s] = 0, -1, sid
+        heap = [h[s] * size * size + s]
+        expanded = 0
+
+        while heap:
+            u = heapq.heappop(heap) % size
+            if closed[u] == sid:
+                continue
+            if u == t:
+                self.expanded, self.frontier = expanded, len(heap)
+                return self._unwind(t)
+            closed[u] = sid
+            expanded += 1
+            cost = g[u] + 1
+            for off in offsets:
+                v = u + off
+                if blocked[v] or (seen[v] == sid and g[v] <= cost):
+                    continue
+                g[v], parent[v], seen[v] = cost, u, sid
+                heapq.heappush(heap, ((cost + h[v]) * size - cost) * size + v)
+        self.expanded, self.frontier = expanded, 0
+        return None
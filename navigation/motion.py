@@ -0,0 +1,185 @@
+"""Vectorised obstacle motion for charts with thousands of contacts.
+
+    motion = ObstacleMotion(grid, ConstantVelocity(), seed=7)
+    nav = Navigator(grid, planner, start, motion=motion)
+
+``Grid.move_obstacles`` steps contacts one at a time in Python, which is
+what the Tk scenarios and their recordings are defined by. ObstacleMotion
+keeps the positions in an (n, 2) array and moves every contact in one NumPy
+pass: a motion model proposes a cell for each contact, and conflicts are
+settled on occupancy arrays.
+"""
+import numpy as np
+
+from .grid import OBSTACLE, TARGET
+
+STEPS = np.array([(-1, 0), (1, 0), (0, -1), (0, 1)])
+
+
+class RandomWalk:
+    """Step to a random open neighbour, as ``Grid.move_obstacles`` does.
+
+    Neighbours taken by targets or by other contacts (where they stood at
+    the start of the tick) are not picked; a contact with none holds.
+    """
+
+    def bind(self, grid, positions, rng):
+        self.grid = grid
+
+    def propose(self, positions, rng):
+        grid = self.grid
+        ahead = positions[:, None, :] + STEPS
+        inside = ((ahead >= 0) & (ahead < (grid.rows, grid.cols))).all(axis=2)
+        r = np.clip(ahead[..., 0], 0, grid.rows - 1)
+        c = np.clip(ahead[..., 1], 0, grid.cols - 1)
+        open_ = inside & (grid.cells[r, c] & (OBSTACLE | TARGET) == 0)
+        # The highest random key among open neighbours picks uniformly.
+        keys = np.where(open_, rng.random(open_.shape), -1.0)
+        pick = keys.argmax(axis=1)
+        rows = np.arange(len(positions))
+        return np.where(open_[rows, pick][:, None], ahead[rows, pick], positions)
+
+    def settle(self, moved):
+        pass
+
+
+class ConstantVelocity:
+    """Hold a heading; turn back the way it came after a blocked move.
+
+    ``velocity`` is an (n, 2) array of steps per tick, by default a random
+    one of the four headings for each contact.
+    """
+
+    def __init__(self, velocity=None):
+        self.velocity = None if velocity is None else np.asarray(velocity, dtype=np.intp)
+
+    def bind(self, grid, positions, rng):
+        if self.velocity is None:
+            self.velocity = STEPS[rng.integers(0, len(STEPS), len(positions))]
+
+    def propose(self, positions, rng):
+        return positions + self.velocity
+
+    def settle(self, moved):
+        self.velocity[~moved] *= -1
+
+
+class Waypoints:
+    """Patrol each contact's route of waypoints, one cell per tick, cyclically.
+
+    ``routes`` holds one sequence of (row, col) waypoints per contact; a
+    contact heads for its current waypoint along the axis with the larger
+    gap and moves on to the next once there, or as soon as a move toward it
+    is refused. By default every contact patrols between where it starts and
+    ``legs`` random cells clear of targets.
+    """
+
+    def __init__(self, routes=None, legs=2):
+        self.routes = routes
+        self.legs = legs
+
+    def bind(self, grid, positions, rng):
+        routes = self.routes
+        if routes is None:
+            clear = np.flatnonzero(grid.cells.reshape(-1) & TARGET == 0)
+            picks = rng.choice(clear, (len(positions), self.legs))
+            picks = np.stack(np.divmod(picks, grid.cols), axis=2)
+            routes = [[tuple(start)] + [tuple(cell) for cell in legs]
+                      for start, legs in zip(positions.tolist(), picks.tolist())]
+        self.count = np.array([len(route) for route in routes], dtype=np.intp)
+        self.first = np.concatenate([[0], np.cumsum(self.count)[:-1]]).astype(np.intp)
+        self.points = np.array([cell for route in routes for cell in route], dtype=np.intp).reshape(-1, 2)
+        self.leg = np.zeros(len(routes), dtype=np.intp)
+
+    def _targets(self, positions):
+        has = self.count > 0
+        at = self.points[np.where(has, self.first + self.leg, 0)] if len(self.points) else positions
+        return np.where(has[:, None], at, positions)
+
+    def propose(self, positions, rng):
+        target = self._targets(positions)
+        arrived = (target == positions).all(axis=1) & (self.count > 0)
+        self.leg[arrived] = (self.leg[arrived] + 1) % self.count[arrived]
+        gap = self._targets(positions) - positions
+        vertical = np.abs(gap[:, 0]) >= np.abs(gap[:, 1])
+        step = np.where(vertical[:, None],
+                        np.column_stack([np.sign(gap[:, 0]), np.zeros_like(gap[:, 0])]),
+                        np.column_stack([np.zeros_like(gap[:, 1]), np.sign(gap[:, 1])]))
+        self._stepping = step.any(axis=1)
+        return positions + step
+
+    def settle(self, moved):
+        refused = self._stepping & ~moved & (self.count > 0)
+        self.leg[refused] = (self.leg[refused] + 1) % self.count[refused]
+
+
+MOTION_MODELS = {
+    "random_walk": RandomWalk,
+    "constant_velocity": ConstantVelocity,
+    "waypoints": Waypoints,
+}
+
+
+class ObstacleMotion:
+    """Move every obstacle of ``grid`` at once under a motion model.
+
+    Each tick the model proposes a cell per contact. A proposal is turned
+    down when it leaves the chart, enters a target or a cell in ``avoid``,
+    enters a cell whose contact stays put, or loses a random draw against
+    other contacts heading for the same cell. Refusals free no cells, so
+    the checks are repeated on occupancy arrays until nothing changes. The
+    model hears which contacts moved, and the grid's cells, ``obstacles``
+    and watchers are updated through ``Grid.apply_moves``.
+    All randomness comes from ``np.random.default_rng(seed)``.
+    """
+
+    def __init__(self, grid, model=None, seed=None):
+        self.grid = grid
+        self.model = RandomWalk() if model is None else model
+        self.rng = np.random.default_rng(seed)
+        self.positions = np.array(grid.obstacles, dtype=np.intp).reshape(-1, 2)
+        self.model.bind(grid, self.positions, self.rng)
+
+    def step(self, avoid=()):
+        """Move the contacts one tick and return the cells vacated or entered.
+
+        The moves of a tick are simultaneous, not one contact after another
+        as in ``Grid.move_obstacles``: a contact may enter the cell another
+        leaves, and two neighbours may swap. Anything that re-applies them,
+        such as a replay, must do so at once, with ``Grid.apply_moves``.
+        """
+        grid, positions = self.grid, self.positions
+        n, cols = len(positions), grid.cols
+        if not n:
+            return []
+        want = np.asarray(self.model.propose(positions, self.rng), dtype=np.intp)
+        inside = ((want >= 0) & (want < (grid.rows, cols))).all(axis=1)
+        here = positions[:, 0] * cols + positions[:, 1]
+        there = np.where(inside, want[:, 0] * cols + want[:, 1], 0)
+        flags = grid.cells.reshape(-1)
+        ok = inside & (there != here) & (flags[there] & TARGET == 0)
+        if avoid:
+            avoid = np.array([r * cols + c for r, c in avoid])
+            ok &= ~np.isin(there, avoid)
+
+        priority = self.rng.permutation(n)
+        occupied = np.zeros(grid.rows * cols, dtype=bool)
+        while True:
+            occupied[:] = False
+            occupied[here[~ok]] = True
+            settled = ok & ~occupied[there]
+            # Of several contacts heading for one cell, the first in priority order wins.
+            movers = priority[settled[priority]]
+            _, first = np.unique(there[movers], return_index=True)
+            settled[:] = False
+            settled[movers[first]] = True
+            if (settled == ok).all():
+                break
+            ok = settled
+
+        moved = np.flatnonzero(ok)
+        self.model.settle(ok)
+        if not len(moved):
+            return []
+        positions[moved] = want[moved]
+        return grid.apply_moves(np.column_stack([moved, want[moved]]))
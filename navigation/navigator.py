@@ -0,0 +1,161 @@
+"""Headless step loop shared by the Tk views and batch runs."""
+import random
+import time
+
+ARRIVED = "arrived"
+MOVED = "moved"
+WAITING = "waiting"
+
+
+class Route:
+    """A planned path plus an O(1) lookup from cell to its index on the path."""
+
+    def __init__(self, cells, step_cost):
+        self.cells = cells
+        self.index = {cell: i for i, cell in enumerate(cells)}
+        # cost_to_go[i] is the cost of following the path from cells[i] on.
+        self.cost_to_go = [0.0] * len(cells)
+        for i in range(len(cells) - 2, -1, -1):
+            self.cost_to_go[i] = self.cost_to_go[i + 1] + step_cost(cells[i], cells[i + 1])
+
+    def blocked(self, grid, cells, position):
+        """True if any of ``cells`` now blocks the path beyond ``position``."""
+        index = self.index
+        return any(index.get(cell, -1) > position and not grid.is_free(cell) for cell in cells)
+
+    def may_shorten(self, grid, cells, position, heuristic):
+        """True if a freed cell could lie on a cheaper route to the end.
+
+        Uses the planner's admissible heuristic as a lower bound, so it never
+        misses a real shortcut but may occasionally trigger a useless replan.
+        """
+        here, goal = self.cells[position], self.cells[-1]
+        budget = self.cost_to_go[position] - 1e-9
+        return any(grid.is_free(cell) and cell not in self.index and
+                   heuristic(here, cell) + heuristic(cell, goal) < budget
+                   for cell in cells)
+
+
+class Navigator:
+    """Move obstacles, replan only when the route needs it, and advance the ship.
+
+    run2.py's order is the default: obstacles move (never onto the ship or
+    the goal), then the ship replans if needed and advances one cell. With
+    ``advance_first=True`` the ship moves before the obstacles, and obstacles
+    may drift onto the ship and the goal, as in run1.py. Given a
+    ``TickStats``, the obstacle and planning phases and the planner's
+    counters are recorded into it; the caller ends each tick. Given an
+    ``ObstacleMotion`` as ``motion``, it moves the obstacles instead of
+    ``Grid.move_obstacles``.
+    """
+
+    def __init__(self, grid, planner, start, advance_first=False, stats=None, motion=None):
+        self.grid = grid
+        self.planner = planner
+        self.position = start
+        self.advance_first = advance_first
+        self.stats = stats
+        self.motion = motion
+        self.route = None
+        self.index = 0
+        # True after a failed replan: the route on hand may be blocked.
+        self.stale = True
+        self.replans = 0
+        self.skipped_replans = 0
+        self.planning_seconds = 0.0
+        # Duration of every replan, in order.
+        self.replan_seconds = []
+        self._changed = []
+        grid.add_watcher(self._on_change)
+        self.replan()
+
+    @property
+    def path(self):
+        return self.route.cells if self.route else None
+
+    def _on_change(self, cells):
+        self._changed.extend(cells)
+
+    def replan(self):
+        """Plan from the current position; keep the old route if that fails."""
+        self.replans += 1
+        self._changed = []
+        began = time.perf_counter()
+        path = self.planner.find_path(self.position)
+        elapsed = time.perf_counter() - began
+        self.planning_seconds += elapsed
+        self.replan_seconds.append(elapsed)
+        if self.stats:
+            self.stats.count("replans")
+            self.stats.count("expanded", self.planner.expanded)
+            self.stats.count("frontier", self.planner.frontier)
+        self.stale = not path
+        if path:
+            self.route = Route(path, self.planner.step_cost)
+            self.index = 0
+        return bool(path)
+
+    def replan_if_needed(self):
+        if self.stats is None:
+            return self._check_route()
+        with self.stats.phase("plan"):
+            return self._check_route()
+
+    def _check_route(self):
+        changed, self._changed = self._changed, []
+        route = self.route
+        # A route that stops short of the goal (a planner out of time) is
+        # only the first stretch: plan the next one every tick.
+        if self.stale or route.cells[self.index] != self.position or route.cells[-1] != self.grid.goal:
+            return self.replan()
+        # Time-expanded planners check the route against predicted traffic.
+        still_valid = getattr(self.planner, "still_valid", None)
+        if still_valid is not None:
+            broken = not still_valid(route.cells, self.index)
+        else:
+            broken = route.blocked(self.grid, changed, self.index)
+        clearance = self.planner.clearance
+        if clearance is not None and changed and not broken:
+            # Traffic closing in on the route raises its cost without blocking it.
+            broken = clearance.path_cost(route.cells[self.index:]) > route.cost_to_go[self.index] + 1e-9
+        if broken or (self.planner.replan_on_shortcut and
+                       route.may_shorten(self.grid, changed, self.index, self.planner.heuristic)):
+            return self.replan()
+        self.skipped_replans += 1
+        return True
+
+    def move_obstacles(self, rng=None):
+        if self.stats is None:
+            return self._move_obstacles(rng)
+        with self.stats.phase("obstacles"):
+            return self._move_obstacles(rng)
+
+    def _move_obstacles(self, rng):
+        avoid = () if self.advance_first else (self.position, self.grid.goal)
+        if self.motion is not None:
+            return self.motion.step(avoid)
+        return self.grid.move_obstacles(avoid=avoid, rng=rng or random)
+
+    def advance(self):
+        if self.route is None or self.index >= len(self.route.cells) - 1:
+            return False
+        self.index += 1
+        self.position = self.route.cells[self.index]
+        return True
+
+    def step(self, rng=None):
+        """Run one tick and return ARRIVED, MOVED or WAITING."""
+        if self.planner.done(self.position):
+            return ARRIVED
+        if self.advance_first:
+            # A stale route means last tick's replan failed; nothing has
+            # changed since, so hold position and let the obstacles move.
+            moved = not self.stale and self.advance()
+            self.move_obstacles(rng)
+            found = self.replan_if_needed()
+            return MOVED if moved and found else WAITING
+        self.move_obstacles(rng)
+        if not self.replan_if_needed():
+            return WAITING
+        self.advance()
+        return MOVED
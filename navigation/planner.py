@@ -0,0 +1,71 @@
+"""Grid path planners."""
+import heapq
+
+
+class Planner:
+    """4-connected A* over a Grid with a Manhattan heuristic.
+
+    Given a ``ClearanceMap`` as ``clearance``, entering a cell also costs
+    its clearance penalty.
+    """
+
+    # Whether the Navigator should replan when freed water might shorten
+    # the route; only true of planners whose routes are shortest paths.
+    replan_on_shortcut = True
+
+    def __init__(self, grid, clearance=None):
+        self.grid = grid
+        self.clearance = clearance
+        # Search counters of the last find_path: nodes expanded, and the
+        # size of the open list when the search stopped.
+        self.expanded = 0
+        self.frontier = 0
+
+    def heuristic(self, a, b):
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+    def done(self, position):
+        """True once a ship at ``position`` has nothing left to do.
+
+        The Navigator asks once per tick, before it moves the ship.
+        """
+        return position == self.grid.goal
+
+    def step_cost(self, a, b):
+        """Cost of moving from ``a`` to the neighbouring cell ``b``."""
+        if self.clearance is None:
+            return self.heuristic(a, b)
+        return self.heuristic(a, b) + self.clearance.view[b]
+
+    def find_path(self, start, goal=None):
+        """Return the list of cells from start to goal, or None if unreachable."""
+        goal = self.grid.goal if goal is None else goal
+        frontier = [(0, start)]
+        came_from = {start: None}
+        cost_so_far = {start: 0}
+        penalty = self.clearance.view if self.clearance is not None else None
+        self.expanded = self.frontier = 0
+
+        while frontier:
+            _, current = heapq.heappop(frontier)
+            if current == goal:
+                self.frontier = len(frontier)
+                return self.reconstruct_path(came_from, goal)
+            self.expanded += 1
+            for neighbor in self.grid.neighbors(current):
+                new_cost = cost_so_far[current] + 1
+                if penalty is not None:
+                    new_cost += penalty[neighbor]
+                if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
+                    cost_so_far[neighbor] = new_cost
+                    priority = new_cost + self.heuristic(neighbor, goal)
+                    heapq.heappush(frontier, (priority, neighbor))
+                    came_from[neighbor] = current
+        return None
+
+    def reconstruct_path(self, came_from, current):
+        path = []
+        while current is not None:
+            path.append(current)
+            current = came_from[current]
+        return list(reversed(path))
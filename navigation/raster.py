@@ -0,0 +1,59 @@
+"""Paint a Grid into a NumPy RGB buffer for image-based views."""
+import numpy as np
+
+from .grid import GOAL, OBSTACLE, TARGET
+
+# Cell classes, in the order of PALETTE.
+WATER, PATH, OBSTACLE_CELL, TARGET_CELL, GOAL_CELL, SHIP = range(6)
+
+PALETTE = np.array([
+    (255, 255, 255),  # open water
+    (173, 216, 230),  # planned path ("lightblue")
+    (0, 0, 0),        # obstacle
+    (255, 0, 0),      # target
+    (0, 128, 0),      # goal ("green")
+    (0, 0, 255),      # ship
+], dtype=np.uint8)
+
+GRID_LINE = (190, 190, 190)
+
+
+class RasterFrame:
+    """One ``cell_px`` pixel square per cell, painted with whole-array writes.
+
+    Every frame is rebuilt from ``grid.cells`` with a handful of masked
+    assignments and one palette lookup, so the cost depends on the pixel
+    count, not on how many cells hold something. Grid lines are drawn when
+    cells are at least 4 pixels wide.
+    """
+
+    def __init__(self, grid, cell_px=1):
+        self.grid = grid
+        self.cell_px = cell_px
+        self.codes = np.empty((grid.rows, grid.cols), dtype=np.uint8)
+        self.header = b"P6 %d %d 255\n" % (grid.cols * cell_px, grid.rows * cell_px)
+
+    def render(self, path=None, ship=None):
+        """Return the frame as a (height, width, 3) uint8 array."""
+        cells, codes = self.grid.cells, self.codes
+        codes.fill(WATER)
+        if path:
+            rows, cols = np.array(path, dtype=np.intp).T
+            codes[rows, cols] = PATH
+        codes[(cells & OBSTACLE) != 0] = OBSTACLE_CELL
+        codes[(cells & TARGET) != 0] = TARGET_CELL
+        codes[(cells & GOAL) != 0] = GOAL_CELL
+        if ship is not None:
+            codes[ship] = SHIP
+        rgb = PALETTE[codes]
+        px = self.cell_px
+        if px > 1:
+            rgb = rgb.repeat(px, axis=0).repeat(px, axis=1)
+        if px >= 4:
+            rgb[::px, :] = GRID_LINE
+            rgb[:, ::px] = GRID_LINE
+        return rgb
+
+    def ppm(self, path=None, ship=None):
+        """The frame as binary PPM bytes, ready for ``tk.PhotoImage(data=...)``."""
+        return self.header + self.render(path, ship).tobytes()
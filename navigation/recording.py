@@ -0,0 +1,273 @@
+"""Compact binary recordings of episodes, with seekable replay.
+
+    python -m navigation.recording episode.navrec --tick 120
+
+A recording is little-endian binary, laid out as
+
+    header    magic, rows, cols, goal, start, seed (-1 if unknown), target
+              and obstacle counts, then the targets and the initial obstacles
+              as int32 (row, col) pairs
+    records   b"T": one per tick with the status, ship cell and route index,
+                    the obstacles that moved as (obstacle, row, col) and the
+                    new path if the ship replanned
+              b"K": a keyframe with every obstacle and the whole path, written
+                    after tick 0 and then every ``keyframe_every`` ticks
+    index     (tick, offset) of every keyframe, then a fixed-size footer
+
+A file cut short (the window was closed mid-episode) has no index. The
+replayer then rebuilds it by scanning the records.
+"""
+import argparse
+import bisect
+import mmap
+import struct
+
+import numpy as np
+
+from .grid import OBSTACLE, Grid
+from .navigator import ARRIVED, MOVED, WAITING
+
+MAGIC = b"NAVREC1\n"
+FOOTER_MAGIC = b"NIDX"
+HEADER = struct.Struct("<8s6iqII")
+TICK = struct.Struct("<cIBiiIII")
+KEYFRAME = struct.Struct("<cIBiiIII")
+FOOTER = struct.Struct("<QII4s")
+INDEX = np.dtype([("tick", "<u4"), ("offset", "<u8")])
+
+# Status codes; START marks the state before the first tick.
+STATUS_CODES = {MOVED: 0, WAITING: 1, ARRIVED: 2}
+STATUSES = {code: status for status, code in STATUS_CODES.items()}
+START = 255
+UNCHANGED = 0xFFFFFFFF
+
+
+def _pairs(cells):
+    return np.asarray(cells, dtype="<i4").reshape(-1, 2)
+
+
+class Recorder:
+    """Append the ticks of one Navigator episode to a recording file.
+
+    Call ``record(status)`` after every ``Navigator.step``; only the
+    obstacles that moved and paths that changed are written, plus a
+    keyframe every ``keyframe_every`` ticks so replay can seek.
+    """
+
+    def __init__(self, path, nav, seed=None, keyframe_every=64):
+        grid = nav.grid
+        self.nav = nav
+        self.keyframe_every = keyframe_every
+        self.file = open(path, "wb")
+        self.tick = 0
+        self.keyframes = []
+        self._obstacles = _pairs(grid.obstacles)
+        self._route = nav.route
+        self._status = START
+        self.file.write(HEADER.pack(MAGIC, grid.rows, grid.cols, *grid.goal, *nav.position,
+                                    -1 if seed is None else seed,
+                                    len(grid.targets), len(grid.obstacles)))
+        self.file.write(_pairs(grid.targets).tobytes())
+        self.file.write(self._obstacles.tobytes())
+        self._keyframe()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _keyframe(self):
+        nav = self.nav
+        path = _pairs(nav.path or ())
+        self.keyframes.append((self.tick, self.file.tell()))
+        self.file.write(KEYFRAME.pack(b"K", self.tick, self._status, *nav.position, nav.index,
+                                      len(self._obstacles), len(path)))
+        self.file.write(self._obstacles.tobytes())
+        self.file.write(path.tobytes())
+
+    def record(self, status):
+        nav = self.nav
+        self.tick += 1
+        self._status = STATUS_CODES[status]
+        current = _pairs(nav.grid.obstacles)
+        moved = np.flatnonzero((current != self._obstacles).any(axis=1))
+        self._obstacles = current
+        path = None
+        if nav.route is not self._route:
+            self._route = nav.route
+            path = _pairs(nav.path or ())
+        self.file.write(TICK.pack(b"T", self.tick, self._status, *nav.position, nav.index,
+                                  len(moved), UNCHANGED if path is None else len(path)))
+        moves = np.column_stack([moved, current[moved]]).astype("<i4")
+        self.file.write(moves.tobytes())
+        if path is not None:
+            self.file.write(path.tobytes())
+        if self.tick % self.keyframe_every == 0:
+            self._keyframe()
+
+    def close(self):
+        if self.file.closed:
+            return
+        index_offset = self.file.tell()
+        self.file.write(np.array(self.keyframes, dtype=INDEX).tobytes())
+        self.file.write(FOOTER.pack(index_offset, len(self.keyframes), self.tick, FOOTER_MAGIC))
+        self.file.close()
+
+
+class Replayer:
+    """Random access to a recording made by ``Recorder``.
+
+    ``seek(tick)`` restores the nearest keyframe at or before ``tick`` and
+    applies the tick records after it; stepping forward from the current
+    tick never goes back to a keyframe. ``grid`` is a live Grid kept in step
+    with the replay (watchers are notified as usual), so a planner built on
+    it can re-run any tick, and ``RasterFrame(replayer.grid)`` re-renders it.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, rows, cols, goal_r, goal_c, start_r, start_c, seed,
+         target_count, obstacle_count) = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a navigation recording")
+        self.seed = None if seed == -1 else seed
+        self.start = (start_r, start_c)
+        offset = HEADER.size
+        targets = self._cells(offset, target_count)
+        offset += target_count * 8
+        obstacles = self._cells(offset, obstacle_count)
+        self.records = offset + obstacle_count * 8
+        self.grid = Grid(rows, cols, goal=(goal_r, goal_c), targets=targets, obstacles=obstacles)
+        if not self._read_index():
+            self._scan()
+        self.tick = -1
+        self.seek(0)
+
+    def _cells(self, offset, count):
+        pairs = np.frombuffer(self.data, dtype="<i4", count=count * 2, offset=offset)
+        return [tuple(cell) for cell in pairs.reshape(-1, 2).tolist()]
+
+    def _read_index(self):
+        if len(self.data) < self.records + FOOTER.size:
+            return False
+        index_offset, count, last_tick, magic = FOOTER.unpack_from(self.data, len(self.data) - FOOTER.size)
+        if magic != FOOTER_MAGIC:
+            return False
+        index = np.frombuffer(self.data, dtype=INDEX, count=count, offset=index_offset)
+        self.keyframe_ticks = index["tick"].tolist()
+        self.keyframe_offsets = index["offset"].tolist()
+        self.end, self.last_tick = index_offset, last_tick
+        return True
+
+    def _scan(self):
+        """Rebuild the keyframe index of a file that was never closed."""
+        self.keyframe_ticks, self.keyframe_offsets = [], []
+        offset, end, last_tick = self.records, len(self.data), 0
+        while True:
+            size = self._record_size(offset, end)
+            if size is None:
+                break
+            if self.data[offset:offset + 1] == b"K":
+                self.keyframe_ticks.append(KEYFRAME.unpack_from(self.data, offset)[1])
+                self.keyframe_offsets.append(offset)
+            else:
+                last_tick = TICK.unpack_from(self.data, offset)[1]
+            offset += size
+        self.end, self.last_tick = offset, last_tick
+
+    def _record_size(self, offset, end):
+        """Byte length of the record at ``offset``, or None if it is cut short."""
+        tag = self.data[offset:offset + 1]
+        if tag == b"T" and offset + TICK.size <= end:
+            *_, moves, path = TICK.unpack_from(self.data, offset)
+            size = TICK.size + moves * 12 + (0 if path == UNCHANGED else path * 8)
+        elif tag == b"K" and offset + KEYFRAME.size <= end:
+            *_, obstacles, path = KEYFRAME.unpack_from(self.data, offset)
+            size = KEYFRAME.size + (obstacles + path) * 8
+        else:
+            return None
+        return size if offset + size <= end else None
+
+    def seek(self, tick):
+        """Move the replay to ``tick`` (clamped to the recorded range) and return self."""
+        tick = max(0, min(tick, self.last_tick))
+        k = bisect.bisect_right(self.keyframe_ticks, tick) - 1
+        if not self.keyframe_ticks[k] <= self.tick <= tick:
+            self._load_keyframe(self.keyframe_offsets[k])
+        while self.tick < tick:
+            self._apply_next()
+        return self
+
+    def step(self):
+        return self.seek(self.tick + 1)
+
+    def frames(self, start=0):
+        """Yield the replayer at every tick from ``start`` to the end."""
+        self.seek(start)
+        yield self
+        while self.tick < self.last_tick:
+            yield self.step()
+
+    def _load_keyframe(self, offset):
+        _, tick, status, r, c, index, obstacle_count, path_len = KEYFRAME.unpack_from(self.data, offset)
+        offset += KEYFRAME.size
+        obstacles = self._cells(offset, obstacle_count)
+        offset += obstacle_count * 8
+        self.path = self._cells(offset, path_len) or None
+        self.tick, self.position, self.index = tick, (r, c), index
+        self.status = STATUSES.get(status, START)
+        self._next = offset + path_len * 8
+        self._place(obstacles)
+
+    def _apply_next(self):
+        offset = self._next
+        if self.data[offset:offset + 1] == b"K":
+            offset += self._record_size(offset, self.end)
+        _, tick, status, r, c, index, move_count, path_len = TICK.unpack_from(self.data, offset)
+        offset += TICK.size
+        moves = np.frombuffer(self.data, dtype="<i4", count=move_count * 3, offset=offset)
+        offset += move_count * 12
+        if path_len != UNCHANGED:
+            self.path = self._cells(offset, path_len) or None
+            offset += path_len * 8
+        self.tick, self.position, self.index = tick, (r, c), index
+        self.status = STATUSES[status]
+        self._next = offset
+        self._move(moves.reshape(-1, 3))
+
+    def _place(self, obstacles):
+        grid = self.grid
+        changed = grid.obstacles + obstacles
+        np.bitwise_and(grid.cells, 0xFF ^ OBSTACLE, out=grid.cells)
+        grid.obstacles = list(obstacles)
+        grid._mark(grid.obstacles, OBSTACLE)
+        grid._notify(changed)
+
+    def _move(self, moves):
+        # A tick's moves are simultaneous under ObstacleMotion (a contact may
+        # enter a cell another leaves, or two may swap), and applying them at
+        # once gives the same cells for Grid.move_obstacles too.
+        self.grid.apply_moves(moves)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording")
+    parser.add_argument("--tick", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    replay = Replayer(args.recording)
+    grid = replay.grid
+    print(f"{grid.rows}x{grid.cols} chart, {len(grid.targets)} targets, {len(grid.obstacles)} obstacles, "
+          f"seed {replay.seed}, {replay.last_tick} ticks, {len(replay.keyframe_ticks)} keyframes")
+    replay.seek(args.tick)
+    status = "start" if replay.status == START else replay.status
+    print(f"tick {replay.tick}: {status}, ship at {replay.position}, route step {replay.index}")
+    print(f"path {replay.path}")
+    print(f"obstacles {grid.obstacles}")
+
+
+if __name__ == "__main__":
+    main()
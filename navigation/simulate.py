@@ -0,0 +1,153 @@
+"""Headless episodes of the moving-obstacle scenario.
+
+    python -m navigation.simulate --scenario run2 --planner flat_astar --episodes 10000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from . import PLANNERS, Grid, Navigator, make_planner
+from .clearance import ClearanceMap
+from .motion import MOTION_MODELS, ObstacleMotion
+from .navigator import ARRIVED, WAITING
+from .recording import Recorder
+from .stats import CsvSink, TickStats
+
+# The settings of the two Tk scenarios.
+SCENARIOS = {
+    "run1": {"size": 10, "target_count": 7, "obstacle_count": 5, "advance_first": True},
+    "run2": {"size": 10, "target_count": 5, "obstacle_count": 10, "advance_first": False},
+}
+
+# Planners whose constructor takes a ``clearance`` map.
+CLEARANCE_PLANNERS = ("astar", "flat_astar")
+
+
+def run_episode(seed, size=10, target_count=5, obstacle_count=10, planner="flat_astar",
+                advance_first=False, max_steps=None, record=None, stats=None, clearance=None,
+                motion=None, **options):
+    """Play one seeded episode from (0, 0) to the far corner and return its metrics.
+
+    The chart and every obstacle move come from ``random.Random(seed)``, so
+    an episode can be replayed exactly. It ends on arrival or after
+    ``max_steps`` ticks (default ``4 * size * size``); a stall is a tick on
+    which no path was found and the ship held position, and a close call
+    one that ended with the ship beside a target or obstacle. A
+    ``clearance`` radius gives the planner a ``ClearanceMap`` (only those in
+    ``CLEARANCE_PLANNERS`` take one), and a
+    ``motion`` model name from ``MOTION_MODELS`` moves the obstacles with
+    ``ObstacleMotion`` instead of ``Grid.move_obstacles``. Pass a file name
+    as ``record`` to save the episode for ``navigation.recording.Replayer``,
+    and a ``TickStats`` as ``stats`` to time every tick. ``replan_ms``
+    lists the duration of each replan.
+    """
+    if clearance and planner not in CLEARANCE_PLANNERS:
+        raise ValueError(f"Planner {planner!r} takes no clearance map; choose from {list(CLEARANCE_PLANNERS)}")
+    rng = random.Random(seed)
+    start, goal = (0, 0), (size - 1, size - 1)
+    grid = Grid.generate(size, target_count, obstacle_count, start, goal, rng)
+    if clearance:
+        options["clearance"] = ClearanceMap(grid, clearance)
+    mover = ObstacleMotion(grid, MOTION_MODELS[motion](), seed) if motion else None
+    nav = Navigator(grid, make_planner(planner, grid, **options), start, advance_first, stats, mover)
+    max_steps = 4 * size * size if max_steps is None else max_steps
+    recorder = Recorder(record, nav, seed) if record else None
+    steps = stalls = close_calls = 0
+    arrived = False
+    while steps < max_steps:
+        status = nav.step(rng)
+        if recorder:
+            recorder.record(status)
+        if stats:
+            stats.end_tick()
+        if status == ARRIVED:
+            arrived = True
+            break
+        steps += 1
+        if status == WAITING:
+            stalls += 1
+        r, c = nav.position
+        if any(grid.in_bounds(cell) and not grid.is_free(cell)
+               for cell in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1))):
+            close_calls += 1
+    if recorder:
+        recorder.close()
+    return {
+        "seed": seed,
+        "arrived": arrived,
+        "steps": steps,
+        "replans": nav.replans,
+        "skipped_replans": nav.skipped_replans,
+        "stalls": stalls,
+        "close_calls": close_calls,
+        "planning_ms": nav.planning_seconds * 1000,
+        "replan_ms": [seconds * 1000 for seconds in nav.replan_seconds],
+    }
+
+
+def summarize(rows):
+    """Aggregate episode rows into success rate and mean costs."""
+    arrived = [row for row in rows if row["arrived"]]
+    return {
+        "episodes": len(rows),
+        "success_rate": len(arrived) / len(rows) if rows else 0.0,
+        "mean_steps": statistics.fmean(row["steps"] for row in arrived) if arrived else None,
+        "mean_replans": statistics.fmean(row["replans"] for row in rows) if rows else None,
+        "stalls": sum(row["stalls"] for row in rows),
+        "close_calls": sum(row["close_calls"] for row in rows),
+        "planning_ms": sum(row["planning_ms"] for row in rows),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="run2")
+    parser.add_argument("--planner", default="flat_astar", help=f"any of {', '.join(sorted(PLANNERS))}")
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first episode")
+    parser.add_argument("--size", type=int)
+    parser.add_argument("--targets", type=int, dest="target_count")
+    parser.add_argument("--obstacles", type=int, dest="obstacle_count")
+    parser.add_argument("--clearance", type=float, metavar="RADIUS",
+                        help="penalise routes within RADIUS cells of anything blocked "
+                             f"({' and '.join(CLEARANCE_PLANNERS)} only)")
+    parser.add_argument("--motion", choices=sorted(MOTION_MODELS),
+                        help="move obstacles with the vectorised motion engine")
+    parser.add_argument("--stats", action="store_true", help="report per-tick phase timings")
+    parser.add_argument("--stats-csv", metavar="FILE", help="write per-tick timings and counters")
+    args = parser.parse_args(argv)
+    if args.clearance and args.planner not in CLEARANCE_PLANNERS:
+        parser.error(f"--clearance needs a planner that takes a clearance map: "
+                     f"{', '.join(CLEARANCE_PLANNERS)}, not {args.planner}")
+
+    settings = dict(SCENARIOS[args.scenario])
+    for name in ("size", "target_count", "obstacle_count"):
+        if getattr(args, name) is not None:
+            settings[name] = getattr(args, name)
+    stats = None
+    if args.stats or args.stats_csv:
+        stats = TickStats(sinks=[CsvSink(args.stats_csv)] if args.stats_csv else [])
+    began = time.perf_counter()
+    rows = [run_episode(seed, planner=args.planner, stats=stats, clearance=args.clearance,
+                        motion=args.motion, **settings)
+            for seed in range(args.seed, args.seed + args.episodes)]
+    elapsed = time.perf_counter() - began
+
+    summary = summarize(rows)
+    print(f"{args.scenario} with {args.planner}: {summary['episodes']} episodes in {elapsed:.1f} s "
+          f"({summary['episodes'] / elapsed * 60:,.0f}/min)")
+    print(f"  arrived      {summary['success_rate']:.1%}")
+    if summary["mean_steps"] is not None:
+        print(f"  mean steps   {summary['mean_steps']:.1f}")
+    print(f"  mean replans {summary['mean_replans']:.1f}")
+    print(f"  stalls       {summary['stalls']}")
+    print(f"  close calls  {summary['close_calls']}")
+    print(f"  planning     {summary['planning_ms']:.0f} ms total")
+    if stats:
+        print(f"  {stats.report()}")
+        stats.close()
+
+
+if __name__ == "__main__":
+    main()
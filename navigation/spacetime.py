@@ -0,0 +1,191 @@
+"""Space-time A*: plan around where the moving obstacles are expected to be."""
+import heapq
+from array import array
+from collections import deque
+
+import numpy as np
+
+from .flat_astar import FlatAStarPlanner
+from .grid import MOVES, TARGET
+
+UNREACHABLE = 0xFFFFFFFF
+
+
+class ObstaclePredictor:
+    """Guess which cells the moving obstacles will hold over the next ticks.
+
+    ``layers(horizon)[j - 1]`` holds the (rows, cols) arrays of cells that
+    may be occupied when the ship enters the j-th cell of a plan made now.
+    Layer 1 is where the obstacles are; layer 2 adds every neighbour they
+    could step to, which covers the one random step ``Grid.move_obstacles``
+    takes; later layers carry each obstacle along its last displacement
+    (constant velocity) until it would run into a target or off the chart.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.previous = np.array(grid.obstacles, dtype=np.intp).reshape(-1, 2)
+        self.velocity = np.zeros_like(self.previous)
+        grid.add_watcher(self._on_change)
+
+    def _on_change(self, cells):
+        current = np.array(self.grid.obstacles, dtype=np.intp).reshape(-1, 2)
+        if current.shape == self.previous.shape:
+            self.velocity = current - self.previous
+        else:
+            self.velocity = np.zeros_like(current)
+        self.previous = current
+
+    def layers(self, horizon):
+        current = np.array(self.grid.obstacles, dtype=np.intp).reshape(-1, 2)
+        position = current
+        layers = [current]
+        for j in range(2, horizon + 1):
+            ahead = position + self.velocity
+            position = np.where(self._passable(ahead)[:, None], ahead, position)
+            if j == 2:
+                steps = np.concatenate([current + move for move in MOVES])
+                layers.append(np.concatenate([current, position, steps[self._passable(steps)]]))
+            else:
+                layers.append(position)
+        return [(layer[:, 0], layer[:, 1]) for layer in layers[:horizon]]
+
+    def _passable(self, cells):
+        """Mask of ``cells`` rows that are on the chart and not a target."""
+        rows, cols = cells[:, 0], cells[:, 1]
+        inside = (rows >= 0) & (rows < self.grid.rows) & (cols >= 0) & (cols < self.grid.cols)
+        ok = inside.copy()
+        ok[inside] = (self.grid.cells[rows[inside], cols[inside]] & TARGET) == 0
+        return ok
+
+
+class SpaceTimeAStarPlanner(FlatAStarPlanner):
+    """A* over (cell, tick) states that steers around predicted obstacles.
+
+    For the first ``horizon`` ticks the ship may move or wait, and a state is
+    rejected when the predictor expects an obstacle on that cell at that
+    tick. Further out the prediction is too vague to help, so time is
+    dropped and only targets block: the search carries on as plain A* over
+    cells, which caps the state space at ``horizon + 1`` copies of the chart.
+    States are stored as ints ``min(t, horizon) * size + index`` in a dict
+    that only holds the states actually reached. The heuristic is the exact
+    distance to the goal around the targets, computed once per goal.
+
+    Returned paths repeat a cell for every tick spent waiting. Use
+    ``still_valid`` to check a plan against a fresh prediction instead of
+    replanning on every obstacle move.
+
+    The prediction is conservative: the tick after next reserves every
+    neighbour of every obstacle, which can fence the ship in although the
+    obstacles may well move out of its way. When no timed plan exists the
+    planner falls back to a plain route around the obstacles where they are
+    now (``timed`` is then False). Its first step is safe, and ``still_valid``
+    rejects it wherever traffic is predicted on it, so the Navigator tries a
+    timed plan again on the next tick instead of sitting WAITING.
+    """
+
+    def __init__(self, grid, horizon=8, predictor=None):
+        super().__init__(grid)
+        self.horizon = horizon
+        self.predictor = predictor or ObstaclePredictor(grid)
+        self._distance_goal = None
+        self._distance = None
+        # False when the last path is the untimed fallback.
+        self.timed = True
+
+    def _distances(self, t):
+        """Breadth-first distances to flat index ``t``; targets never move."""
+        if self._distance_goal != t:
+            static = np.ones((self.grid.rows + 2, self.grid.cols + 2), dtype=np.uint8)
+            static[1:-1, 1:-1] = self.grid.cells & TARGET
+            blocked = static.reshape(-1).tobytes()
+            dist = array("I", [UNREACHABLE]) * self.size
+            dist[t] = 0
+            queue = deque([t])
+            while queue:
+                u = queue.popleft()
+                d = dist[u] + 1
+                for off in self.offsets:
+                    v = u + off
+                    if dist[v] == UNREACHABLE and not blocked[v]:
+                        dist[v] = d
+                        queue.append(v)
+            self._distance_goal, self._distance = t, dist
+        return self._distance
+
+    def find_path(self, start, goal=None):
+        goal = self.grid.goal if goal is None else goal
+        s, t = self.index(start), self.index(goal)
+        self.expanded = self.frontier = 0
+        if s == t:
+            return [start]
+        dist = self._distances(t)
+        if dist[s] == UNREACHABLE:
+            return None
+        path = self._timed_search(s, t, dist)
+        self.timed = path is not None
+        if path is None:
+            expanded = self.expanded
+            path = super().find_path(start, goal)
+            self.expanded += expanded
+        return path
+
+    def _timed_search(self, s, t, dist):
+        """A* over (cell, tick) from flat index ``s``; None if traffic bars every way."""
+        size, horizon, offsets = self.size, self.horizon, self.offsets
+        reserved = [None] + self._reserved()
+
+        parent = {s: -1}
+        g_last = {}
+        heap = [(dist[s], 0, s)]
+        while heap:
+            _, cost, key = heapq.heappop(heap)
+            cost = -cost
+            layer, u = divmod(key, size)
+            if layer == horizon and cost > g_last[key]:
+                continue
+            if u == t:
+                self.frontier = len(heap)
+                return self._timed_path(parent, key)
+            self.expanded += 1
+            cost += 1
+            if layer < horizon:
+                moves, block = offsets + (0,), reserved[layer + 1]
+            else:
+                moves, block = offsets, ()
+            base = min(layer + 1, horizon) * size
+            for off in moves:
+                v = u + off
+                if dist[v] == UNREACHABLE or v in block:
+                    continue
+                nkey = base + v
+                if layer + 1 < horizon:
+                    # Every state in a timed layer is reached at the same cost.
+                    if nkey in parent:
+                        continue
+                elif g_last.get(nkey, UNREACHABLE) <= cost:
+                    continue
+                else:
+                    g_last[nkey] = cost
+                parent[nkey] = key
+                heapq.heappush(heap, (cost + dist[v], -cost, nkey))
+        return None
+
+    def _timed_path(self, parent, key):
+        size = self.size
+        path = []
+        while key != -1:
+            path.append(self.cell(key % size))
+            key = parent[key]
+        return list(reversed(path))
+
+    def _reserved(self):
+        """Flat indices of the predicted obstacle cells, one set per tick."""
+        width = self.width
+        return [set(((rows + 1) * width + cols + 1).tolist())
+                for rows, cols in self.predictor.layers(self.horizon)]
+
+    def still_valid(self, path, index):
+        """True if no predicted obstacle lies on the next ``horizon`` cells after ``path[index]``."""
+        return not any(self.index(cell) in layer
+                       for cell, layer in zip(path[index + 1:], self._reserved()))
@@ -0,0 +1,179 @@
+"""Per-tick phase timings and planner counters.
+
+The Navigator times its own phases (obstacle moves, planning) into a
+``TickStats`` when given one; callers time anything else, such as drawing,
+and close each tick:
+
+    stats = TickStats(budget_ms=300, sinks=[CsvSink("ticks.csv")])
+    nav = Navigator(grid, planner, start, stats=stats)
+    while nav.step() != ARRIVED:
+        with stats.phase("render"):
+            draw()
+        stats.end_tick()
+    print(stats.report())
+"""
+import bisect
+import csv
+import logging
+import time
+from collections import deque
+
+PHASES = ("obstacles", "plan", "render")
+COUNTERS = ("replans", "expanded", "frontier")
+
+# Histogram bucket upper edges in ms: ten per decade from 10 us to 10 s.
+EDGES = [0.01 * 10 ** (i / 10) for i in range(61)]
+
+
+class RollingHistogram:
+    """Bucketed latencies of the last ``window`` samples.
+
+    Adding a sample is O(log buckets), and percentiles are read from the
+    bucket counts, so they are accurate to one bucket (about 26%). ``max``
+    is the largest sample ever added.
+    """
+
+    def __init__(self, window=1000, edges=EDGES):
+        self.edges = edges
+        self.counts = [0] * (len(edges) + 1)
+        self.samples = deque()
+        self.window = window
+        self.max = 0.0
+
+    def add(self, ms):
+        bucket = bisect.bisect_left(self.edges, ms)
+        self.samples.append(bucket)
+        self.counts[bucket] += 1
+        if len(self.samples) > self.window:
+            self.counts[self.samples.popleft()] -= 1
+        self.max = max(self.max, ms)
+
+    def percentile(self, q):
+        """Upper edge of the bucket holding the ``q``-th percentile, in ms."""
+        if not self.samples:
+            return None
+        rank = q / 100 * len(self.samples)
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.edges[bucket], self.max) if bucket < len(self.edges) else self.max
+        return self.max
+
+
+class _Timer:
+    __slots__ = ("stats", "name", "began")
+
+    def __init__(self, stats, name):
+        self.stats, self.name = stats, name
+
+    def __enter__(self):
+        self.began = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.stats.add(self.name, time.perf_counter() - self.began)
+
+
+class TickStats:
+    """Phase times and counters for the current tick, plus rolling histograms.
+
+    ``add`` and ``count`` accumulate into the open tick; ``end_tick`` closes
+    it, feeds the per-phase and whole-tick histograms, checks the tick
+    against ``budget_ms`` and hands the row to every sink.
+    """
+
+    def __init__(self, window=1000, budget_ms=None, sinks=()):
+        self.window = window
+        self.budget_ms = budget_ms
+        self.sinks = list(sinks)
+        self.ticks = 0
+        self.over_budget = 0
+        self.histograms = {"tick": RollingHistogram(window)}
+        self.totals = {}
+        self.row = {}
+
+    def phase(self, name):
+        """Context manager that adds the time spent inside it to phase ``name``."""
+        return _Timer(self, name)
+
+    def add(self, phase, seconds):
+        self.row[phase] = self.row.get(phase, 0.0) + seconds
+
+    def count(self, counter, value=1):
+        self.row[counter] = self.row.get(counter, 0) + value
+
+    def end_tick(self):
+        self.ticks += 1
+        row, self.row = self.row, {}
+        total = 0.0
+        for name, value in row.items():
+            self.totals[name] = self.totals.get(name, 0) + value
+            if name not in COUNTERS:
+                total += value
+                if name not in self.histograms:
+                    self.histograms[name] = RollingHistogram(self.window)
+                self.histograms[name].add(value * 1000)
+        self.histograms["tick"].add(total * 1000)
+        if self.budget_ms is not None and total * 1000 > self.budget_ms:
+            self.over_budget += 1
+        row["tick"] = self.ticks
+        row["total"] = total
+        for sink in self.sinks:
+            sink(self, row)
+
+    def summary(self):
+        """Per-phase p50/p99/max in ms over the rolling window, plus counter totals."""
+        phases = {name: {"p50_ms": hist.percentile(50), "p99_ms": hist.percentile(99), "max_ms": hist.max}
+                  for name, hist in self.histograms.items()}
+        counters = {name: self.totals.get(name, 0) for name in COUNTERS}
+        return {"ticks": self.ticks, "over_budget": self.over_budget, "phases": phases, **counters}
+
+    def report(self):
+        summary = self.summary()
+        parts = [f"{name} p50 {p['p50_ms']:.2g} / p99 {p['p99_ms']:.2g} / max {p['max_ms']:.2g} ms"
+                 for name, p in summary["phases"].items() if p["p50_ms"] is not None]
+        line = f"{summary['ticks']} ticks: " + "; ".join(parts)
+        if self.budget_ms is not None:
+            line += f"; {summary['over_budget']} over the {self.budget_ms} ms budget"
+        return line
+
+    def close(self):
+        for sink in self.sinks:
+            close = getattr(sink, "close", None)
+            if close:
+                close()
+
+
+class CsvSink:
+    """Write one CSV row per tick: phase times in ms and counters."""
+
+    def __init__(self, path, flush_every=100):
+        self.file = open(path, "w", newline="")
+        fields = ["tick", "total_ms"] + [f"{phase}_ms" for phase in PHASES] + list(COUNTERS)
+        self.writer = csv.DictWriter(self.file, fields, extrasaction="ignore")
+        self.writer.writeheader()
+        self.flush_every = flush_every
+
+    def __call__(self, stats, row):
+        out = {name: value for name, value in row.items() if name in COUNTERS or name == "tick"}
+        out["total_ms"] = f"{row['total'] * 1000:.3f}"
+        for phase in PHASES:
+            out[f"{phase}_ms"] = f"{row.get(phase, 0.0) * 1000:.3f}"
+        self.writer.writerow(out)
+        if row["tick"] % self.flush_every == 0:
+            self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class LogSink:
+    """Log ``TickStats.report()`` every ``every`` ticks."""
+
+    def __init__(self, every=100, logger=None):
+        self.every = every
+        self.logger = logger or logging.getLogger("navigation.stats")
+
+    def __call__(self, stats, row):
+        if row["tick"] % self.every == 0:
+            self.logger.info(stats.report())
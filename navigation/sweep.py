@@ -0,0 +1,104 @@
+"""Monte Carlo sweeps of the simulation across a process pool.
+
+    python -m navigation.sweep --sizes 10 20 --obstacles 10 40 --targets 5 --seeds 2000
+"""
+import argparse
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from . import PLANNERS
+from .simulate import run_episode, summarize
+
+
+def percentile(values, q):
+    """Nearest-rank ``q``-th percentile of already sorted ``values``."""
+    if not values:
+        return None
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+def _run_chunk(settings, seeds):
+    return [run_episode(seed, **settings) for seed in seeds]
+
+
+def sweep(configs, seeds, planner="flat_astar", advance_first=False, workers=None):
+    """Play every seed under every (size, obstacle_count, target_count) config.
+
+    Episodes are sharded into chunks of consecutive seeds and spread over
+    ``workers`` processes (default: one per CPU); each episode still gets its
+    own ``random.Random(seed)``, so results do not depend on the sharding.
+    Returns one aggregated row per config, in the order given.
+    """
+    configs = list(configs)
+    workers = workers or os.cpu_count() or 1
+    # A few chunks per worker keeps the pool busy to the end without paying
+    # a round trip per episode.
+    chunk = max(1, min(500, len(seeds) * len(configs) // (workers * 8)))
+    rows = {config: [] for config in configs}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for config in configs:
+            size, obstacle_count, target_count = config
+            settings = {"size": size, "obstacle_count": obstacle_count, "target_count": target_count,
+                        "planner": planner, "advance_first": advance_first}
+            for lo in range(0, len(seeds), chunk):
+                futures[pool.submit(_run_chunk, settings, seeds[lo:lo + chunk])] = config
+        for future in as_completed(futures):
+            rows[futures[future]].extend(future.result())
+    return [aggregate(config, rows[config]) for config in configs]
+
+
+def aggregate(config, rows):
+    """Success rate, mean costs and per-replan latency percentiles for one config.
+
+    The percentiles are taken over every replan of every episode, not over
+    each episode's mean, so a few slow replans show up in p99.
+    """
+    size, obstacle_count, target_count = config
+    latency = sorted(ms for row in rows for ms in row["replan_ms"])
+    return {
+        "size": size,
+        "obstacles": obstacle_count,
+        "targets": target_count,
+        **summarize(rows),
+        "p50_ms": percentile(latency, 50),
+        "p95_ms": percentile(latency, 95),
+        "p99_ms": percentile(latency, 99),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10])
+    parser.add_argument("--obstacles", type=int, nargs="+", default=[10])
+    parser.add_argument("--targets", type=int, nargs="+", default=[5])
+    parser.add_argument("--seeds", type=int, default=1000, help="episodes per config")
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--planner", default="flat_astar", help=f"any of {', '.join(sorted(PLANNERS))}")
+    parser.add_argument("--advance-first", action="store_true", help="run1.py step order")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args(argv)
+
+    configs = list(itertools.product(args.sizes, args.obstacles, args.targets))
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+    began = time.perf_counter()
+    table = sweep(configs, seeds, args.planner, args.advance_first, args.workers)
+    elapsed = time.perf_counter() - began
+
+    episodes = len(configs) * len(seeds)
+    print(f"{episodes} episodes with {args.planner} in {elapsed:.1f} s ({episodes / elapsed * 60:,.0f}/min)")
+    print(f"{'size':>6}{'obstacles':>11}{'targets':>9}{'arrived':>9}{'steps':>8}{'replans':>9}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for row in table:
+        steps = "-" if row["mean_steps"] is None else f"{row['mean_steps']:.1f}"
+        print(f"{row['size']:>6}{row['obstacles']:>11}{row['targets']:>9}{row['success_rate']:>9.1%}"
+              f"{steps:>8}{row['mean_replans']:>9.1f}"
+              + "".join(f"{row[k]:>9.3f}" if row[k] is not None else f"{'-':>9}"
+                        for k in ("p50_ms", "p95_ms", "p99_ms")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""Tiled chart files for charts too large to hold in memory.
+
+    python -m navigation.tiles coast.npy coast.navtile --tile 256
+
+    chart = TiledChart("coast.navtile", goal=(812000, 40312))
+    path = make_planner("astar", chart).find_path((3, 9))
+
+A tiled chart is little-endian binary, laid out as
+
+    header    magic, rows, cols, tile side and tile count
+    index     (offset, length) of every tile in row-major tile order; a
+              length of 0 marks a tile whose cells all hold one flag byte,
+              stored in place of the offset
+    tiles     zlib-compressed tile x tile cell flags (``TARGET`` bits, as in
+              ``Grid.cells``); tiles on the right and bottom edges are padded
+
+Only the static layer is stored. Obstacles and the goal live in memory on
+the ``TiledChart``, as they do on a Grid.
+"""
+import argparse
+import mmap
+import random
+import struct
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+from .grid import BLOCKED, MOVES, TARGET, Grid
+
+MAGIC = b"NAVTILE1"
+HEADER = struct.Struct("<8sQQII")
+INDEX = np.dtype([("offset", "<u8"), ("length", "<u4")])
+
+
+def write_tiles(path, targets, tile=256, level=6):
+    """Write a boolean (rows, cols) target array as a tiled chart file.
+
+    ``targets`` is read one band of tiles at a time, so it may be a
+    ``np.load(..., mmap_mode="r")`` array larger than memory. ``tile``
+    must be a power of two.
+    """
+    if tile <= 0 or tile & (tile - 1):
+        raise ValueError(f"tile side must be a power of two, not {tile}")
+    rows, cols = targets.shape
+    down, across = -(-rows // tile), -(-cols // tile)
+    index = np.zeros(down * across, dtype=INDEX)
+    block = np.zeros((tile, tile), dtype=np.uint8)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, rows, cols, tile, len(index)))
+        f.write(index.tobytes())
+        for tr in range(down):
+            band = np.asarray(targets[tr * tile:(tr + 1) * tile], dtype=bool)
+            for tc in range(across):
+                part = band[:, tc * tile:(tc + 1) * tile]
+                block.fill(TARGET)
+                block[:part.shape[0], :part.shape[1]] = np.where(part, TARGET, 0)
+                entry = index[tr * across + tc]
+                first = block.flat[0]
+                if (block == first).all():
+                    entry["offset"], entry["length"] = first, 0
+                    continue
+                data = zlib.compress(block.tobytes(), level)
+                entry["offset"], entry["length"] = f.tell(), len(data)
+                f.write(data)
+        f.seek(HEADER.size)
+        f.write(index.tobytes())
+
+
+class TiledChart:
+    """A chart read tile by tile from a file written by ``write_tiles``.
+
+    The file is memory-mapped and only the header is read up front, so
+    opening a chart takes the same time at any size. Tiles are decoded on
+    first use and kept in an LRU of ``cache_tiles`` entries; ``hits`` and
+    ``misses`` count lookups. The chart offers what ``Planner`` and
+    ``Navigator`` use of a Grid (``is_free``, ``neighbors``, watchers,
+    ``move_obstacles``), so ``astar`` plans on it directly. Planners that
+    mirror the whole chart into arrays need a Grid: ``window()`` cuts one out.
+    """
+
+    def __init__(self, path, goal=None, obstacles=(), cache_tiles=256):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.rows, self.cols, self.tile, count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a tiled chart")
+        self.shift = self.tile.bit_length() - 1
+        self.across = -(-self.cols // self.tile)
+        self.index = np.frombuffer(self.data, dtype=INDEX, count=count, offset=HEADER.size)
+        self.cache_tiles = cache_tiles
+        self._tiles = OrderedDict()
+        self._last = (None, None)
+        self.hits = self.misses = 0
+        self.obstacles = list(obstacles)
+        self._occupied = set(self.obstacles)
+        self.goal = goal
+        self.version = 0
+        self._watchers = []
+
+    def _tile(self, key):
+        """Cell flags of tile ``key`` as a 2-D memoryview."""
+        if key == self._last[0]:
+            self.hits += 1
+            return self._last[1]
+        tiles = self._tiles
+        view = tiles.get(key)
+        if view is not None:
+            self.hits += 1
+            tiles.move_to_end(key)
+        else:
+            self.misses += 1
+            offset, length = self.index[key].tolist()
+            if length:
+                raw = zlib.decompress(self.data[offset:offset + length])
+            else:
+                raw = bytes((offset,)) * (self.tile * self.tile)
+            view = memoryview(raw).cast("B", (self.tile, self.tile))
+            tiles[key] = view
+            if len(tiles) > self.cache_tiles:
+                tiles.popitem(last=False)
+        self._last = (key, view)
+        return view
+
+    def flags(self, cell):
+        """Static flag byte of ``cell`` (``TARGET`` or 0)."""
+        r, c = cell
+        shift = self.shift
+        mask = self.tile - 1
+        return self._tile((r >> shift) * self.across + (c >> shift))[r & mask, c & mask]
+
+    def add_watcher(self, callback):
+        """Call ``callback(cells)`` whenever the listed cells change blocked state."""
+        self._watchers.append(callback)
+
+    def _notify(self, cells):
+        self.version += 1
+        for callback in self._watchers:
+            callback(cells)
+
+    def in_bounds(self, cell):
+        r, c = cell
+        return 0 <= r < self.rows and 0 <= c < self.cols
+
+    def is_free(self, cell):
+        return not self.flags(cell) & BLOCKED and cell not in self._occupied
+
+    def neighbors(self, cell):
+        r, c = cell
+        shift, mask = self.shift, self.tile - 1
+        # Most neighbours share the cell's tile: look it up once.
+        key = (r >> shift) * self.across + (c >> shift)
+        here = self._tile(key)
+        occupied = self._occupied
+        neighbors = []
+        for dr, dc in MOVES:
+            nr, nc = r + dr, c + dc
+            if not (0 <= nr < self.rows and 0 <= nc < self.cols):
+                continue
+            if (nr >> shift) * self.across + (nc >> shift) == key:
+                flags = here[nr & mask, nc & mask]
+            else:
+                flags = self.flags((nr, nc))
+            if not flags & BLOCKED and (nr, nc) not in occupied:
+                neighbors.append((nr, nc))
+        return neighbors
+
+    def move_obstacles(self, avoid=(), rng=random):
+        """Step every obstacle to a random free neighbour, as ``Grid.move_obstacles``."""
+        occupied = self._occupied
+        changed = []
+        for i, obs in enumerate(self.obstacles):
+            moves = [m for m in self.neighbors(obs) if m not in avoid]
+            if moves:
+                new = rng.choice(moves)
+                occupied.discard(obs)
+                occupied.add(new)
+                self.obstacles[i] = new
+                changed += [obs, new]
+        if changed:
+            self._notify(changed)
+        return changed
+
+    def window(self, top, left, rows, cols):
+        """Grid of the ``rows`` x ``cols`` cells from (top, left).
+
+        Obstacles and the goal inside the window come along; every cell is
+        in window coordinates.
+        """
+        rows = min(rows, self.rows - top)
+        cols = min(cols, self.cols - left)
+        mask = np.zeros((rows, cols), dtype=bool)
+        tile, shift = self.tile, self.shift
+        for tr in range(top >> shift, ((top + rows - 1) >> shift) + 1):
+            for tc in range(left >> shift, ((left + cols - 1) >> shift) + 1):
+                r0, c0 = max(tr * tile, top), max(tc * tile, left)
+                r1, c1 = min((tr + 1) * tile, top + rows), min((tc + 1) * tile, left + cols)
+                flags = np.asarray(self._tile(tr * self.across + tc))
+                mask[r0 - top:r1 - top, c0 - left:c1 - left] = (
+                    flags[r0 - tr * tile:r1 - tr * tile, c0 - tc * tile:c1 - tc * tile] & TARGET) != 0
+
+        def inside(cell):
+            return top <= cell[0] < top + rows and left <= cell[1] < left + cols
+
+        goal = self.goal
+        goal = (goal[0] - top, goal[1] - left) if goal is not None and inside(goal) else None
+        obstacles = [(r - top, c - left) for r, c in self.obstacles if inside((r, c))]
+        return Grid.from_mask(mask, goal=goal, obstacles=obstacles)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("targets", help=".npy boolean (rows, cols) array marking the targets")
+    parser.add_argument("chart", help="tiled chart file to write")
+    parser.add_argument("--tile", type=int, default=256, help="tile side, a power of two")
+    args = parser.parse_args(argv)
+
+    write_tiles(args.chart, np.load(args.targets, mmap_mode="r"), args.tile)
+    chart = TiledChart(args.chart)
+    uniform = int((chart.index["length"] == 0).sum())
+    print(f"{chart.rows}x{chart.cols} chart in {len(chart.index)} tiles of {chart.tile}x{chart.tile}, "
+          f"{uniform} uniform, {len(chart.data):,} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Visit a set of waypoints on the way to the goal.
+
+    planner = make_planner("tour", grid, waypoints=[(3, 7), (8, 2)], workers=4)
+
+Waypoints on open water are visited by entering them; a waypoint on a
+target (a buoy) is visited from any open cell beside it. The planner builds
+the step counts between the visit cells of the start, every waypoint and
+the goal with one breadth-first wavefront per visit cell, orders the visits
+with nearest neighbour plus 2-opt and Or-opt, picks the visit cell of each
+point along that order, and joins the legs with flat A*.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .flat_astar import FlatAStarPlanner
+from .flowfield import UNREACHABLE, wavefront
+from .grid import TARGET
+from .planner import Planner
+
+# Cost of an unreachable leg in the visiting order; any tour using one is
+# worth more than every tour that does not.
+NO_LEG = 1 << 40
+
+
+def _rows(free, offsets, sources, cells):
+    """Distances from each of ``sources`` to every one of ``cells``."""
+    return [wavefront(free, offsets, [source])[cells] for source in sources]
+
+
+def tour_cost(cost, tour):
+    return sum(cost[a][b] for a, b in zip(tour, tour[1:]))
+
+
+def order_visits(cost):
+    """Visiting order from point 0 to point n - 1 through all the others.
+
+    ``cost`` is a symmetric n x n matrix (nested lists). Nearest neighbour
+    gives a first tour; 2-opt (reversing a stretch) and Or-opt (moving a
+    run of one to three points elsewhere, either way round) then repeat
+    until neither shortens it. Both ends stay fixed.
+    """
+    n = len(cost)
+    if n <= 3:
+        return list(range(n))
+    left = set(range(1, n - 1))
+    tour = [0]
+    while left:
+        here = cost[tour[-1]]
+        nearest = min(left, key=here.__getitem__)
+        tour.append(nearest)
+        left.remove(nearest)
+    tour.append(n - 1)
+
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, n - 2):
+            for k in range(i + 1, n - 1):
+                a, b, c, d = tour[i - 1], tour[i], tour[k], tour[k + 1]
+                if cost[a][c] + cost[b][d] < cost[a][b] + cost[c][d]:
+                    tour[i:k + 1] = tour[i:k + 1][::-1]
+                    improved = True
+        for length in (1, 2, 3):
+            for i in range(1, n - length):
+                run = tour[i:i + length]
+                before, after = tour[i - 1], tour[i + length]
+                saved = cost[before][run[0]] + cost[run[-1]][after] - cost[before][after]
+                rest = tour[:i] + tour[i + length:]
+                best, where = 0, None
+                for j in range(len(rest) - 1):
+                    p, q = rest[j], rest[j + 1]
+                    for piece in (run, run[::-1]):
+                        gain = saved - (cost[p][piece[0]] + cost[piece[-1]][q] - cost[p][q])
+                        if gain > best:
+                            best, where = gain, (j, piece)
+                if where is not None:
+                    j, piece = where
+                    tour = rest[:j + 1] + piece + rest[j + 1:]
+                    improved = True
+                    break
+    return tour
+
+
+class TourPlanner(Planner):
+    """Route from the start through every waypoint, then to the goal.
+
+    The distance matrix is cached until the chart changes (``grid.version``)
+    or the set of points does; with ``workers`` above 1 its rows are shared
+    over a process pool kept for the planner's lifetime (``close()`` ends
+    it). Waypoints reached on a route the planner returned are struck off,
+    so replanning mid-tour only orders the ones still ahead; ``reset()``
+    puts them all back. ``order`` is the waypoint order of the last route.
+    The tour is done only at the goal with every waypoint struck off, so a
+    route that crosses the goal on the way to a waypoint carries on.
+    """
+
+    # Tours are not shortest paths to the goal, so freed water off the
+    # route is no reason to replan.
+    replan_on_shortcut = False
+
+    def __init__(self, grid, waypoints=(), workers=1):
+        super().__init__(grid)
+        self.waypoints = [tuple(cell) for cell in waypoints]
+        self.workers = workers or os.cpu_count() or 1
+        self.legs = FlatAStarPlanner(grid)
+        self.order = []
+        self._pool = None
+        self._key = None
+        self.reset()
+
+    def reset(self):
+        self.remaining = list(range(len(self.waypoints)))
+        self._path = None
+        self._visits = []
+        self._at = 0
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _visit_cells(self, cell):
+        grid = self.grid
+        if not grid.cells[cell] & TARGET:
+            return [cell]
+        r, c = cell
+        return [n for n in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1))
+                if grid.in_bounds(n) and not grid.cells[n] & TARGET]
+
+    def distance_matrix(self, points):
+        """Step counts between ``points`` and between their visit cells.
+
+        Returns ``(cost, reach, owners, cells)``: ``cells`` is every visit
+        cell, ``owners`` the point each belongs to, ``reach[a, b]`` the
+        steps from visit cell a to visit cell b (``UNREACHABLE`` if there is
+        no way) and ``cost[i][j]`` the fewest steps from any visit cell of
+        point i to any of point j (``NO_LEG`` if there is none).
+        """
+        key = (self.grid.version, tuple(points))
+        if key == self._key:
+            return self._matrix
+        legs = self.legs
+        groups = [self._visit_cells(point) for point in points]
+        cells = [cell for group in groups for cell in group]
+        owners = np.repeat(np.arange(len(points)), [len(group) for group in groups])
+        flat = np.array([legs.index(cell) for cell in cells], dtype=np.intp)
+        sources = flat.tolist()
+        free = legs._blocked.reshape(-1) == 0
+        if self.workers > 1 and len(points) > 2:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            chunks = [sources[i::self.workers] for i in range(self.workers)]
+            futures = [self._pool.submit(_rows, free, legs.offsets, chunk, flat) for chunk in chunks]
+            parts = [future.result() for future in futures]
+            rows = [None] * len(cells)
+            for i, part in enumerate(parts):
+                rows[i::self.workers] = part
+        else:
+            rows = _rows(free, legs.offsets, sources, flat)
+        # A cell under an obstacle can be left but not entered; count such
+        # legs as missing both ways so the matrix stays symmetric.
+        reach = np.array(rows, dtype=np.int64).reshape(len(cells), len(cells))
+        reach = np.maximum(reach, reach.T)
+        # cost[i, j] = min of reach over the visit cells of i and of j.
+        nearest = np.full((len(points), len(cells)), UNREACHABLE, dtype=np.int64)
+        np.minimum.at(nearest, owners, reach)
+        cost = np.full((len(points), len(points)), UNREACHABLE, dtype=np.int64)
+        np.minimum.at(cost.T, owners, nearest.T)
+        cost = np.where(cost == UNREACHABLE, NO_LEG, cost).tolist()
+        self._key = key
+        self._matrix = (cost, reach, owners, cells)
+        return self._matrix
+
+    def find_path(self, start, goal=None):
+        goal = self.grid.goal if goal is None else goal
+        self._strike_off(start)
+        ahead = self.remaining
+        points = [start] + [self.waypoints[i] for i in ahead] + [goal]
+        cost, reach, owners, cells = self.distance_matrix(points)
+        tour = order_visits(cost)
+        self.expanded, self.frontier = len(points), 0
+        if tour_cost(cost, tour) >= NO_LEG:
+            return None
+
+        path = [start]
+        visits = []
+        for point, cell in zip(tour[1:], self._visit_order(tour, reach, owners)):
+            leg = self.legs.find_path(path[-1], cells[cell])
+            if leg is None:
+                return None
+            path += leg[1:]
+            if point != len(points) - 1:
+                visits.append((len(path) - 1, ahead[point - 1]))
+        self.order = [ahead[i - 1] for i in tour[1:-1]]
+        self._path, self._visits, self._at = path, visits, 0
+        return path
+
+    @staticmethod
+    def _visit_order(tour, reach, owners):
+        """Visit cell of every point after the first, cheapest as driven.
+
+        Each leg runs from the visit cell picked for the point before, so
+        the choice is a shortest path through the tour's columns of cells.
+        """
+        columns = [np.flatnonzero(owners == tour[0])]
+        spent = np.zeros(len(columns[0]), dtype=np.int64)
+        back = []
+        for point in tour[1:]:
+            mine = np.flatnonzero(owners == point)
+            total = spent[:, None] + reach[np.ix_(columns[-1], mine)]
+            back.append(total.argmin(axis=0))
+            spent = total.min(axis=0)
+            columns.append(mine)
+        k = spent.argmin()
+        picked = []
+        for column, came_from in zip(reversed(columns[1:]), reversed(back)):
+            picked.append(column[k])
+            k = came_from[k]
+        return picked[::-1]
+
+    def done(self, position):
+        self._strike_off(position)
+        return position == self.grid.goal and not self.remaining
+
+    def _strike_off(self, position):
+        # The ship only ever stands on cells of the last route we returned
+        # and moves at most one cell along it between calls; where a cell
+        # repeats, take the first occurrence from where it was last seen.
+        if not self._path or position not in self._path[self._at:]:
+            return
+        self._at = self._path.index(position, self._at)
+        done = {waypoint for at, waypoint in self._visits if at <= self._at}
+        self.remaining = [i for i in self.remaining if i not in done]
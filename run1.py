@@ -1,9 +1,29 @@
-import tkinter as tk
-import heapq
 import random
+import tkinter as tk
+
+from navigation import ARRIVED, MOTION_MODELS, WAITING, Grid, Navigator, ObstacleMotion, make_planner
+from navigation.grid import OBSTACLE, TARGET
+from navigation.raster import RasterFrame
+from navigation.recording import Recorder
+from navigation.stats import CsvSink, TickStats
 
 GRID_SIZE = 10
 CELL_SIZE = 60
+PLANNER = "flat_astar"
+# "canvas" keeps one Tk item per cell; "raster" blits a single image and
+# is the one to use for charts of more than a few thousand cells.
+RENDERER = "canvas"
+# Set SEED to replay a scenario; set RECORD to a file name to save the
+# episode for navigation.recording.Replayer.
+SEED = None
+RECORD = None
+# Per-tick phase timings are summarised on arrival; set STATS_CSV to a file
+# name to also write one row per tick.
+STATS_CSV = None
+TICK_MS = 300
+# Set MOTION to "random_walk", "constant_velocity" or "waypoints" to move the
+# obstacles with the vectorised engine in navigation.motion.
+MOTION = None
 TARGET_COUNT = 7
 OBSTACLE_COUNT = 5
 
@@ -16,91 +36,81 @@ class AStarNavigator:
         self.start = (0, 0)
         self.goal = (GRID_SIZE - 1, GRID_SIZE - 1)
 
-        all_cells = [(r, c) for r in range(GRID_SIZE) for c in range(GRID_SIZE)]
-        safe_cells = [cell for cell in all_cells if cell not in [self.start, self.goal]]
-        self.targets = random.sample(safe_cells, TARGET_COUNT)
-        remaining = [c for c in safe_cells if c not in self.targets]
-        self.obstacles = random.sample(remaining, OBSTACLE_COUNT)
-
-        self.current_pos = self.start
-        self.path = self.find_path(self.current_pos)
-        self.index = 0
+        seed = random.randrange(2 ** 32) if SEED is None else SEED
+        print(f"Scenario seed {seed}")
+        self.rng = random.Random(seed)
+        self.grid = Grid.generate(GRID_SIZE, TARGET_COUNT, OBSTACLE_COUNT, self.start, self.goal, self.rng)
+        self.stats = TickStats(budget_ms=TICK_MS, sinks=[CsvSink(STATS_CSV)] if STATS_CSV else [])
+        motion = ObstacleMotion(self.grid, MOTION_MODELS[MOTION](), seed) if MOTION else None
+        self.nav = Navigator(self.grid, make_planner(PLANNER, self.grid), self.start,
+                             advance_first=True, stats=self.stats, motion=motion)
+        self.recorder = Recorder(RECORD, self.nav, seed) if RECORD else None
+
+        # Canvas items are created once; each tick only recolours the cells
+        # that changed and moves the ship.
+        self.rects = {}
+        self.fills = {}
+        self.route = None
+        self.on_path = set()
+        self.dirty = set()
+        if RENDERER == "raster":
+            self.frame = RasterFrame(self.grid, CELL_SIZE)
+            self.image = tk.PhotoImage(width=GRID_SIZE * CELL_SIZE, height=GRID_SIZE * CELL_SIZE)
+            self.canvas.create_image(0, 0, image=self.image, anchor="nw")
+        else:
+            self.grid.add_watcher(self.dirty.update)
+            self.draw_everything()
+        self.update_drawing()
 
         self.root.after(500, self.step)
 
-    def heuristic(self, a, b):
-        return abs(a[0] - b[0]) + abs(a[1] - b[1])
-
-    def get_neighbors(self, node):
-        r, c = node
-        neighbors = []
-        for dr, dc in [(-1,0),(1,0),(0,-1),(0,1)]:
-            nr, nc = r + dr, c + dc
-            if (0 <= nr < GRID_SIZE and 0 <= nc < GRID_SIZE and
-                (nr, nc) not in self.obstacles and
-                (nr, nc) not in self.targets):
-                neighbors.append((nr, nc))
-        return neighbors
-
-    def find_path(self, start):
-        frontier = [(0, start)]
-        came_from = {start: None}
-        cost_so_far = {start: 0}
-
-        while frontier:
-            _, current = heapq.heappop(frontier)
-            if current == self.goal:
-                break
-            for neighbor in self.get_neighbors(current):
-                new_cost = cost_so_far[current] + 1
-                if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
-                    cost_so_far[neighbor] = new_cost
-                    priority = new_cost + self.heuristic(neighbor, self.goal)
-                    heapq.heappush(frontier, (priority, neighbor))
-                    came_from[neighbor] = current
-
-        if self.goal not in came_from:
-            return None
-
-        path = []
-        current = self.goal
-        while current:
-            path.append(current)
-            current = came_from[current]
-        return list(reversed(path))
-
-    def move_obstacles(self):
-        new_obstacles = []
-        for obs in self.obstacles:
-            neighbors = self.get_neighbors(obs)
-            new_obstacles.append(random.choice(neighbors) if neighbors else obs)
-        self.obstacles = new_obstacles
+    def cell_color(self, cell):
+        flags = self.grid.cells[cell]
+        if cell == self.start:
+            return "white"
+        if cell == self.goal:
+            return "green"
+        if flags & TARGET:
+            return "red"
+        if flags & OBSTACLE:
+            return "black"
+        if cell in self.on_path:
+            return "lightblue"
+        return "white"
 
     def draw_everything(self):
-        self.canvas.delete("all")
         for r in range(GRID_SIZE):
             for c in range(GRID_SIZE):
                 x1, y1 = c * CELL_SIZE, r * CELL_SIZE
                 x2, y2 = x1 + CELL_SIZE, y1 + CELL_SIZE
                 cell = (r, c)
-                if cell == self.start:
-                    fill = "white"
-                elif cell == self.goal:
-                    fill = "green"
-                elif cell in self.targets:
-                    fill = "red"
-                elif cell in self.obstacles:
-                    fill = "black"
-                elif self.path and cell in self.path:
-                    fill = "lightblue"
-                else:
-                    fill = "white"
-                self.canvas.create_rectangle(x1, y1, x2, y2, fill=fill, outline="gray")
-
-        if self.path and self.index < len(self.path) - 1:
-            curr = self.path[self.index]
-            nxt = self.path[self.index + 1]
-            self.draw_ship(curr, nxt)
+                fill = self.cell_color(cell)
+                self.rects[cell] = self.canvas.create_rectangle(x1, y1, x2, y2, fill=fill, outline="gray")
+                self.fills[cell] = fill
+        self.ship = self.canvas.create_polygon(0, 0, 0, 0, 0, 0, fill="blue", state="hidden")
+
+    def update_drawing(self):
+        if RENDERER == "raster":
+            self.image.configure(data=self.frame.ppm(self.nav.path, self.nav.position), format="PPM")
+            return
+        changed = set(self.dirty)
+        self.dirty.clear()
+        if self.nav.route is not self.route:
+            self.route = self.nav.route
+            on_path = set(self.nav.path or ())
+            changed |= on_path ^ self.on_path
+            self.on_path = on_path
+        for cell in changed:
+            fill = self.cell_color(cell)
+            if fill != self.fills[cell]:
+                self.fills[cell] = fill
+                self.canvas.itemconfig(self.rects[cell], fill=fill)
+
+        path, index = self.nav.path, self.nav.index
+        if path and index < len(path) - 1:
+            self.draw_ship(path[index], path[index + 1])
+        else:
+            self.canvas.itemconfig(self.ship, state="hidden")
 
     def draw_ship(self, curr, nxt):
         r, c = curr
@@ -120,28 +130,28 @@ class AStarNavigator:
         else:
             points = [cx - size, cy - size, cx + size, cy - size, cx, cy + size]
 
-        self.canvas.create_polygon(points, fill="blue")
+        self.canvas.coords(self.ship, *points)
+        self.canvas.itemconfig(self.ship, state="normal")
 
     def step(self):
-        if not self.path or self.index >= len(self.path) - 1:
-            print("✅ Reached goal or no path.")
-            self.draw_everything()
+        status = self.nav.step(self.rng)
+        if self.recorder:
+            self.recorder.record(status)
+        if status == ARRIVED:
+            print("✅ Reached goal.")
+            print(self.stats.report())
+            self.stats.close()
+            if self.recorder:
+                self.recorder.close()
+            self.update_drawing()
             return
-
-        self.current_pos = self.path[self.index + 1]
-        self.index += 1
-
-        self.move_obstacles()
-
-        new_path = self.find_path(self.current_pos)
-        if new_path:
-            self.path = new_path
-            self.index = 0
-        else:
+        if status == WAITING:
             print("⚠️ No path found. Waiting at current position.")
 
-        self.draw_everything()
-        self.root.after(300, self.step)
+        with self.stats.phase("render"):
+            self.update_drawing()
+        self.stats.end_tick()
+        self.root.after(TICK_MS, self.step)
 
 root = tk.Tk()
 root.title("A* Ship Navigation with Moving Obstacles")
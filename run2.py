@@ -1,9 +1,29 @@
-import tkinter as tk
-import heapq
 import random
+import tkinter as tk
+
+from navigation import ARRIVED, MOTION_MODELS, WAITING, Grid, Navigator, ObstacleMotion, make_planner
+from navigation.grid import OBSTACLE, TARGET
+from navigation.raster import RasterFrame
+from navigation.recording import Recorder
+from navigation.stats import CsvSink, TickStats
 
 GRID_SIZE = 10
 CELL_SIZE = 60
+PLANNER = "flat_astar"
+# "canvas" keeps one Tk item per cell; "raster" blits a single image and
+# is the one to use for charts of more than a few thousand cells.
+RENDERER = "canvas"
+# Set SEED to replay a scenario; set RECORD to a file name to save the
+# episode for navigation.recording.Replayer.
+SEED = None
+RECORD = None
+# Per-tick phase timings are summarised on arrival; set STATS_CSV to a file
+# name to also write one row per tick.
+STATS_CSV = None
+TICK_MS = 300
+# Set MOTION to "random_walk", "constant_velocity" or "waypoints" to move the
+# obstacles with the vectorised engine in navigation.motion.
+MOTION = None
 OBSTACLE_COUNT = 10
 TARGET_COUNT = 5
 
@@ -16,36 +36,65 @@ class AStarNavigator:
         self.start = (0, 0)
         self.goal = (GRID_SIZE - 1, GRID_SIZE - 1)
 
-        all_cells = [(r, c) for r in range(GRID_SIZE) for c in range(GRID_SIZE) if (r, c) not in [self.start, self.goal]]
-        self.targets = random.sample(all_cells, TARGET_COUNT)
-        remaining_cells = [c for c in all_cells if c not in self.targets]
-        self.obstacles = random.sample(remaining_cells, OBSTACLE_COUNT)
-
-        self.current_pos = self.start
-        self.path = self.find_path(self.start)
-        self.index = 0
-
-        self.draw_everything()
+        seed = random.randrange(2 ** 32) if SEED is None else SEED
+        print(f"Scenario seed {seed}")
+        self.rng = random.Random(seed)
+        self.grid = Grid.generate(GRID_SIZE, TARGET_COUNT, OBSTACLE_COUNT, self.start, self.goal, self.rng)
+        self.stats = TickStats(budget_ms=TICK_MS, sinks=[CsvSink(STATS_CSV)] if STATS_CSV else [])
+        motion = ObstacleMotion(self.grid, MOTION_MODELS[MOTION](), seed) if MOTION else None
+        self.nav = Navigator(self.grid, make_planner(PLANNER, self.grid), self.start,
+                             stats=self.stats, motion=motion)
+        self.recorder = Recorder(RECORD, self.nav, seed) if RECORD else None
+
+        # Canvas items are created once; each tick only recolours the cells
+        # obstacles moved through and moves the ship.
+        self.rects = {}
+        self.fills = {}
+        self.dirty = set()
+        if RENDERER == "raster":
+            self.frame = RasterFrame(self.grid, CELL_SIZE)
+            self.image = tk.PhotoImage(width=GRID_SIZE * CELL_SIZE, height=GRID_SIZE * CELL_SIZE)
+            self.canvas.create_image(0, 0, image=self.image, anchor="nw")
+            self.update_drawing()
+        else:
+            self.grid.add_watcher(self.dirty.update)
+            self.draw_everything()
         self.root.after(500, self.step)
 
+    def cell_color(self, cell):
+        flags = self.grid.cells[cell]
+        if cell == self.goal:
+            return "green"
+        if flags & TARGET:
+            return "red"
+        if flags & OBSTACLE:
+            return "black"
+        return "white"
+
     def draw_everything(self):
-        self.canvas.delete("all")
         for r in range(GRID_SIZE):
             for c in range(GRID_SIZE):
                 x1, y1 = c * CELL_SIZE, r * CELL_SIZE
                 x2, y2 = x1 + CELL_SIZE, y1 + CELL_SIZE
                 cell = (r, c)
-                if cell == self.goal:
-                    color = "green"
-                elif cell in self.targets:
-                    color = "red"
-                elif cell in self.obstacles:
-                    color = "black"
-                else:
-                    color = "white"
-                self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="gray")
+                color = self.cell_color(cell)
+                self.rects[cell] = self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="gray")
+                self.fills[cell] = color
+
+        self.ship = self.canvas.create_oval(0, 0, 0, 0, fill="blue")
+        self.draw_ship(*self.nav.position)
 
-        self.draw_ship(*self.current_pos)
+    def update_drawing(self):
+        if RENDERER == "raster":
+            self.image.configure(data=self.frame.ppm(ship=self.nav.position), format="PPM")
+            return
+        for cell in self.dirty:
+            color = self.cell_color(cell)
+            if color != self.fills[cell]:
+                self.fills[cell] = color
+                self.canvas.itemconfig(self.rects[cell], fill=color)
+        self.dirty.clear()
+        self.draw_ship(*self.nav.position)
 
     def draw_ship(self, row, col):
         margin = 10
@@ -53,89 +102,26 @@ class AStarNavigator:
         y1 = row * CELL_SIZE + margin
         x2 = x1 + CELL_SIZE - 2 * margin
         y2 = y1 + CELL_SIZE - 2 * margin
-        self.canvas.create_oval(x1, y1, x2, y2, fill="blue")
+        self.canvas.coords(self.ship, x1, y1, x2, y2)
 
     def step(self):
-        if self.current_pos == self.goal:
+        status = self.nav.step(self.rng)
+        if self.recorder:
+            self.recorder.record(status)
+        if status == ARRIVED:
             print("✅ Goal reached!")
+            print(self.stats.report())
+            self.stats.close()
+            if self.recorder:
+                self.recorder.close()
             return
-
-        self.move_obstacles()
-
-        # Replan path after obstacles move
-        new_path = self.find_path(self.current_pos)
-        if new_path:
-            self.path = new_path
-            self.index = 0
-        else:
+        if status == WAITING:
             print("⚠️ No path found. Waiting...")
-            self.draw_everything()
-            self.root.after(300, self.step)
-            return
-
-        # Move along path
-        if self.index < len(self.path) - 1:
-            self.index += 1
-            self.current_pos = self.path[self.index]
-
-        self.draw_everything()
-        self.root.after(300, self.step)
-
-    def heuristic(self, a, b):
-        return abs(a[0] - b[0]) + abs(a[1] - b[1])
-
-    def find_path(self, start):
-        open_set = []
-        heapq.heappush(open_set, (0, start))
-        came_from = {}
-        g_score = {start: 0}
-        f_score = {start: self.heuristic(start, self.goal)}
-        visited = set()
-
-        while open_set:
-            _, current = heapq.heappop(open_set)
-
-            if current == self.goal:
-                return self.reconstruct_path(came_from, current)
-
-            visited.add(current)
-            for neighbor in self.get_neighbors(current):
-                if neighbor in visited:
-                    continue
-                tentative_g = g_score[current] + 1
-                if neighbor not in g_score or tentative_g < g_score[neighbor]:
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g
-                    f_score[neighbor] = tentative_g + self.heuristic(neighbor, self.goal)
-                    heapq.heappush(open_set, (f_score[neighbor], neighbor))
-        return None
-
-    def reconstruct_path(self, came_from, current):
-        path = [current]
-        while current in came_from:
-            current = came_from[current]
-            path.append(current)
-        return list(reversed(path))
-
-    def get_neighbors(self, cell):
-        r, c = cell
-        neighbors = []
-        for dr, dc in [(-1,0), (1,0), (0,-1), (0,1)]:
-            nr, nc = r + dr, c + dc
-            new_pos = (nr, nc)
-            if (0 <= nr < GRID_SIZE and 0 <= nc < GRID_SIZE and
-                new_pos not in self.obstacles and
-                new_pos not in self.targets):
-                neighbors.append(new_pos)
-        return neighbors
 
-    def move_obstacles(self):
-        new_obstacles = []
-        for obs in self.obstacles:
-            moves = self.get_neighbors(obs)
-            valid = [m for m in moves if m != self.current_pos and m != self.goal and m not in self.obstacles]
-            new_obstacles.append(random.choice(valid) if valid else obs)
-        self.obstacles = new_obstacles
+        with self.stats.phase("render"):
+            self.update_drawing()
+        self.stats.end_tick()
+        self.root.after(TICK_MS, self.step)
 
 # Launch the GUI
 if __name__ == "__main__":
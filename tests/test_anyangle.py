@@ -0,0 +1,84 @@
+import heapq
+import math
+
+import pytest
+
+from navigation import Grid, make_planner
+from navigation.benchmark import make_chart
+
+KINDS = ("open", "channels", "clutter", "maze")
+
+
+def octile_lengths(grid, goal):
+    """8-connected Dijkstra from ``goal`` that never cuts a blocked corner."""
+    dist = {goal: 0.0}
+    heap = [(0.0, goal)]
+    while heap:
+        d, (r, c) = heapq.heappop(heap)
+        if d > dist[(r, c)]:
+            continue
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                cell = (r + dr, c + dc)
+                if cell == (r, c) or not grid.in_bounds(cell) or not grid.is_free(cell):
+                    continue
+                if dr and dc and not (grid.is_free((r + dr, c)) and grid.is_free((r, c + dc))):
+                    continue
+                nd = d + (math.sqrt(2) if dr and dc else 1.0)
+                if nd < dist.get(cell, math.inf):
+                    dist[cell] = nd
+                    heapq.heappush(heap, (nd, cell))
+    return dist
+
+
+def check_route(grid, path, start, goal):
+    assert path[0] == start and path[-1] == goal
+    for (ar, ac), (br, bc) in zip(path, path[1:]):
+        assert max(abs(ar - br), abs(ac - bc)) == 1
+        assert grid.is_free((br, bc))
+        if ar != br and ac != bc:
+            assert grid.is_free((ar, bc)) and grid.is_free((br, ac)), "route clips a corner"
+
+
+def length(path):
+    return sum(math.hypot(a[0] - b[0], a[1] - b[1]) for a, b in zip(path, path[1:]))
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_octile_is_optimal(kind):
+    for seed in range(10):
+        grid, start, goal = make_chart(kind, 24, seed)
+        path = make_planner("octile", grid).find_path(start, goal)
+        best = octile_lengths(grid, goal).get(start)
+        if best is None:
+            assert path is None
+            continue
+        check_route(grid, path, start, goal)
+        assert length(path) == pytest.approx(best)
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+@pytest.mark.parametrize("kind", KINDS)
+def test_theta_routes_are_valid(kind, lazy):
+    for seed in range(10):
+        grid, start, goal = make_chart(kind, 24, seed)
+        planner = make_planner("theta", grid, lazy=lazy)
+        path = planner.find_path(start, goal)
+        if octile_lengths(grid, goal).get(start) is None:
+            assert path is None
+            continue
+        check_route(grid, path, start, goal)
+        assert planner.waypoints[0] == start and planner.waypoints[-1] == goal
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_theta_plans_from_a_start_under_an_obstacle(lazy):
+    # In run1 order an obstacle may drift onto the ship's cell; the route
+    # must still leave from there.
+    targets = [(0, 2), (1, 4), (2, 3), (2, 4), (3, 1), (3, 2)]
+    grid = Grid(5, goal=(0, 0), targets=targets, obstacles=[(4, 4)])
+    path = make_planner("theta", grid, lazy=lazy).find_path((4, 4))
+    assert path[0] == (4, 4) and path[-1] == (0, 0)
+    for (ar, ac), (br, bc) in zip(path, path[1:]):
+        assert max(abs(ar - br), abs(ac - bc)) == 1
+        assert grid.is_free((br, bc))
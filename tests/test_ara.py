@@ -0,0 +1,75 @@
+import math
+import time
+from collections import deque
+
+import pytest
+
+from navigation import Navigator, make_planner
+from navigation.benchmark import make_chart
+
+KINDS = ("open", "channels", "clutter", "maze")
+
+
+def steps_to(grid, goal):
+    """4-connected breadth-first step counts to ``goal``."""
+    dist = {goal: 0}
+    queue = deque([goal])
+    while queue:
+        r, c = cell = queue.popleft()
+        for near in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+            if grid.in_bounds(near) and grid.is_free(near) and near not in dist:
+                dist[near] = dist[cell] + 1
+                queue.append(near)
+    return dist
+
+
+def check_route(grid, path, start):
+    assert path[0] == start
+    for (ar, ac), (br, bc) in zip(path, path[1:]):
+        assert abs(ar - br) + abs(ac - bc) == 1
+        assert grid.is_free((br, bc))
+
+
+@pytest.mark.parametrize("kind", KINDS)
+@pytest.mark.parametrize("seed", range(3))
+def test_path_within_the_proven_bound(kind, seed):
+    grid, start, goal = make_chart(kind, 61, seed)
+    optimal = steps_to(grid, goal).get(start)
+    for budget_ms, epsilon in ((None, 3.0), (None, 1.5), (1000, 3.0)):
+        planner = make_planner("ara", grid, epsilon=epsilon, budget_ms=budget_ms)
+        path = planner.find_path(start)
+        if optimal is None:
+            assert path is None
+            continue
+        check_route(grid, path, start)
+        assert path[-1] == goal
+        assert 1 <= planner.epsilon <= epsilon
+        assert len(path) - 1 <= planner.epsilon * optimal + 1e-9
+        if budget_ms is None:
+            assert planner.epsilon == 1.0 and len(path) - 1 == optimal
+
+
+def test_first_round_keeps_to_the_budget():
+    grid, start, goal = make_chart("maze", 601, 0)
+    planner = make_planner("ara", grid, budget_ms=5)
+    began = time.perf_counter()
+    path = planner.find_path(start)
+    elapsed = time.perf_counter() - began
+    assert elapsed < 0.1
+    check_route(grid, path, start)
+    assert path[-1] != goal and planner.epsilon == math.inf
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_partial_routes_reach_the_goal(kind):
+    # With no budget at all every call stops after a few hundred expansions;
+    # learned estimates must keep the ship out of dead ends.
+    grid, start, goal = make_chart(kind, 61, 1)
+    optimal = steps_to(grid, goal).get(start)
+    if optimal is None:
+        pytest.skip("no way to the goal")
+    nav = Navigator(grid, make_planner("ara", grid, budget_ms=0), start)
+    for _ in range(20 * optimal):
+        if nav.step() == "arrived":
+            break
+    assert nav.position == goal
@@ -0,0 +1,16 @@
+from navigation.benchmark import P99_SAMPLES, compare, make_chart, time_planner
+
+
+def test_p99_only_with_enough_repeats():
+    grid, start, goal = make_chart("clutter", 30, 0)
+    few = time_planner("flat_astar", grid, start, goal, repeats=5)
+    assert few["p99_ms"] is None and few["max_ms"] >= few["p50_ms"]
+    many = time_planner("flat_astar", grid, start, goal, repeats=P99_SAMPLES)
+    assert many["p50_ms"] <= many["p99_ms"] <= many["max_ms"]
+
+
+def test_compare_flags_changed_searches():
+    grid, start, goal = make_chart("maze", 31, 0)
+    row = {"chart": "maze", "size": 31, "seed": 0, **time_planner("flat_astar", grid, start, goal)}
+    assert compare([row], [row], tolerance=0.2) == []
+    assert compare([dict(row, expanded=row["expanded"] + 1)], [row], tolerance=0.2)
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from navigation import Grid, make_planner
+from navigation.benchmark import make_chart
+
+
+def check_route(grid, path, start, goal):
+    assert path[0] == start and path[-1] == goal
+    for (ar, ac), (br, bc) in zip(path, path[1:]):
+        assert abs(ar - br) + abs(ac - bc) == 1 and grid.is_free((br, bc))
+
+
+@pytest.mark.parametrize("advance_first", [False, True])
+def test_repairs_match_a_fresh_search(advance_first):
+    # Obstacles move and the ship advances between calls; every repaired
+    # route must be as short as flat A* finds from scratch.
+    for seed in range(30):
+        rng = random.Random(seed)
+        grid = Grid.generate(12, 20, 15, (0, 0), (11, 11), rng)
+        dstar, fresh = make_planner("dstar_lite", grid), make_planner("flat_astar", grid)
+        position = (0, 0)
+        for _ in range(40):
+            path, best = dstar.find_path(position), fresh.find_path(position)
+            if best is None:
+                assert path is None
+            else:
+                check_route(grid, path, position, grid.goal)
+                assert len(path) == len(best)
+                if len(path) == 1:
+                    break
+                position = path[1]
+            avoid = () if advance_first else (position, grid.goal)
+            grid.move_obstacles(avoid=avoid, rng=rng)
+
+
+def test_new_goal_restarts_the_search():
+    grid, start, goal = make_chart("maze", 21, 3)
+    planner = make_planner("dstar_lite", grid)
+    other = (0, 20) if grid.is_free((0, 20)) else goal
+    for target in (goal, other, goal):
+        path = planner.find_path(start, target)
+        best = make_planner("flat_astar", grid).find_path(start, target)
+        assert (path is None) == (best is None)
+        if path is not None:
+            assert len(path) == len(best)
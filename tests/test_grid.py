@@ -0,0 +1,26 @@
+import numpy as np
+
+from navigation import Grid
+from navigation.grid import OBSTACLE
+
+
+def occupied(grid):
+    return {tuple(cell) for cell in np.argwhere(grid.cells & OBSTACLE).tolist()}
+
+
+def test_apply_moves_is_simultaneous():
+    grid = Grid(1, 6, obstacles=[(0, 0), (0, 1), (0, 3), (0, 4)])
+    seen = []
+    grid.add_watcher(seen.append)
+    # A chain (0 -> 1's old cell while 1 moves on) and a swap (2 <-> 3).
+    changed = grid.apply_moves([(0, 0, 1), (1, 0, 2), (2, 0, 4), (3, 0, 3)])
+    assert grid.obstacles == [(0, 1), (0, 2), (0, 4), (0, 3)]
+    assert occupied(grid) == {(0, 1), (0, 2), (0, 3), (0, 4)}
+    assert grid.is_free((0, 0)) and grid.is_free((0, 5))
+    assert seen == [changed] and grid.version == 1
+
+
+def test_apply_moves_with_nothing_to_move():
+    grid = Grid(3, obstacles=[(1, 1)])
+    assert grid.apply_moves([]) == []
+    assert grid.version == 0 and occupied(grid) == {(1, 1)}
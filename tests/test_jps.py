@@ -0,0 +1,73 @@
+import heapq
+import math
+
+import pytest
+
+from navigation import make_planner
+from navigation.benchmark import make_chart
+
+KINDS = ("open", "channels", "clutter", "maze")
+
+
+def shortest(grid, start, goal, diagonal):
+    """Dijkstra over 4- or 8-connected moves; diagonals never cut a blocked corner."""
+    moves = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    if diagonal:
+        moves += [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+    dist = {start: 0.0}
+    heap = [(0.0, start)]
+    while heap:
+        d, (r, c) = heapq.heappop(heap)
+        if (r, c) == goal:
+            return d
+        if d > dist[(r, c)]:
+            continue
+        for dr, dc in moves:
+            cell = (r + dr, c + dc)
+            if not grid.in_bounds(cell) or not grid.is_free(cell):
+                continue
+            if dr and dc and not (grid.is_free((r + dr, c)) and grid.is_free((r, c + dc))):
+                continue
+            nd = d + (math.sqrt(2) if dr and dc else 1.0)
+            if nd < dist.get(cell, math.inf):
+                dist[cell] = nd
+                heapq.heappush(heap, (nd, cell))
+    return None
+
+
+def route_cost(grid, path, diagonal):
+    cost = 0.0
+    for (ar, ac), (br, bc) in zip(path, path[1:]):
+        dr, dc = abs(ar - br), abs(ac - bc)
+        assert grid.is_free((br, bc))
+        if dr and dc:
+            assert diagonal and dr == dc == 1
+            assert grid.is_free((ar, bc)) and grid.is_free((br, ac)), "route clips a corner"
+            cost += math.sqrt(2)
+        else:
+            assert dr + dc == 1
+            cost += 1.0
+    return cost
+
+
+@pytest.mark.parametrize("kind", KINDS)
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("name,diagonal", [("jps", False), ("jps", True), ("jps_plus", False), ("jps_plus", True)])
+def test_routes_are_shortest(kind, seed, name, diagonal):
+    grid, start, goal = make_chart(kind, 41, seed)
+    best = shortest(grid, start, goal, diagonal)
+    path = make_planner(name, grid, diagonal=diagonal).find_path(start)
+    if best is None:
+        assert path is None
+        return
+    assert path[0] == start and path[-1] == goal
+    assert route_cost(grid, path, diagonal) == pytest.approx(best)
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_jps4_matches_flat_astar(kind):
+    grid, start, goal = make_chart(kind, 101, 0)
+    flat = make_planner("flat_astar", grid).find_path(start)
+    for name in ("jps", "jps_plus"):
+        path = make_planner(name, grid).find_path(start)
+        assert len(path) == len(flat)
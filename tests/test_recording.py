@@ -0,0 +1,39 @@
+import random
+
+import numpy as np
+import pytest
+
+from navigation import MOTION_MODELS, Grid, Navigator, ObstacleMotion, make_planner
+from navigation.navigator import ARRIVED
+from navigation.recording import Recorder, Replayer
+
+
+def record(path, seed, motion=None, ticks=60, size=16):
+    """Play ``ticks`` ticks into ``path`` and return the obstacle cells after each."""
+    rng = random.Random(seed)
+    grid = Grid.generate(size, 20, 40, (0, 0), (size - 1, size - 1), rng)
+    mover = ObstacleMotion(grid, MOTION_MODELS[motion](), seed) if motion else None
+    nav = Navigator(grid, make_planner("flat_astar", grid), (0, 0), motion=mover)
+    states = [grid.cells.copy()]
+    with Recorder(path, nav, seed, keyframe_every=16) as recorder:
+        for _ in range(ticks):
+            status = nav.step(rng)
+            recorder.record(status)
+            states.append(grid.cells.copy())
+            if status == ARRIVED:
+                break
+    return states
+
+
+@pytest.mark.parametrize("motion", [None, *sorted(MOTION_MODELS)])
+def test_replay_matches_live_cells(tmp_path, motion):
+    for seed in range(5):
+        path = str(tmp_path / f"{seed}.navrec")
+        states = record(path, seed, motion)
+        replay = Replayer(path)
+        for tick, cells in enumerate(states):
+            replay.seek(tick)
+            assert np.array_equal(replay.grid.cells, cells), (seed, tick)
+        # Seeking back lands on a keyframe and replays forward from it.
+        for tick in range(len(states) - 1, -1, -7):
+            assert np.array_equal(replay.seek(tick).grid.cells, states[tick]), (seed, tick)
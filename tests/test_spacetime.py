@@ -0,0 +1,77 @@
+import random
+
+import numpy as np
+import pytest
+
+from navigation import Grid, Navigator, make_planner
+from navigation.benchmark import make_chart
+from navigation.flat_astar import FlatAStarPlanner
+from navigation.grid import TARGET
+from navigation.motion import MOTION_MODELS, ObstacleMotion
+
+
+def check_timed_route(grid, path, start, reserved):
+    """Every step moves or waits onto open water clear of the predicted traffic."""
+    assert path[0] == start and path[-1] == grid.goal
+    for tick, ((ar, ac), (br, bc)) in enumerate(zip(path, path[1:])):
+        assert abs(ar - br) + abs(ac - bc) <= 1
+        assert grid.in_bounds((br, bc))
+        if tick < len(reserved):
+            rows, cols = reserved[tick]
+            assert (br, bc) not in set(zip(rows.tolist(), cols.tolist()))
+
+
+def busy_chart(contacts):
+    """41x41 clutter with ``contacts`` obstacles on random open cells."""
+    chart, start, goal = make_chart("clutter", 41, 3)
+    mask = chart.cells & TARGET != 0
+    free = [tuple(map(int, cell)) for cell in zip(*np.nonzero(~mask))]
+    free = [cell for cell in free if cell not in (start, goal)]
+    obstacles = random.Random(3).sample(free, contacts)
+    return Grid.from_mask(mask, goal=goal, obstacles=obstacles), start, goal
+
+
+def test_falls_back_when_the_prediction_fences_the_ship_in():
+    # The tick after next reserves every neighbour of all three obstacles,
+    # so no timed plan exists, yet the row above is open water now.
+    grid = Grid(2, 4, goal=(0, 1), obstacles=[(1, 3), (0, 0), (1, 2)])
+    planner = make_planner("spacetime", grid)
+    assert planner.find_path((0, 3)) == [(0, 3), (0, 2), (0, 1)]
+    assert not planner.timed
+    nav = Navigator(grid, planner, (0, 3), motion=ObstacleMotion(grid, seed=0))
+    assert nav.step() == "moved"
+
+
+@pytest.mark.parametrize("model", sorted(MOTION_MODELS))
+def test_plans_whenever_the_chart_has_a_way(model):
+    grid, start, goal = busy_chart(150)
+    motion = ObstacleMotion(grid, MOTION_MODELS[model](), seed=3)
+    planner = make_planner("spacetime", grid)
+    flat = FlatAStarPlanner(grid)
+    for _ in range(60):
+        motion.step(avoid=(start, goal))
+        reserved = planner.predictor.layers(planner.horizon)
+        path = planner.find_path(start)
+        if flat.find_path(start) is None:
+            continue
+        assert path is not None
+        assert grid.is_free(path[1])
+        if planner.timed:
+            check_timed_route(grid, path, start, reserved)
+            assert planner.still_valid(path, 0)
+
+
+@pytest.mark.parametrize("model", sorted(MOTION_MODELS))
+def test_ship_waits_only_when_boxed_in(model):
+    grid, start, goal = busy_chart(300)
+    nav = Navigator(grid, make_planner("spacetime", grid), start,
+                    motion=ObstacleMotion(grid, MOTION_MODELS[model](), seed=3))
+    flat = FlatAStarPlanner(grid)
+    for _ in range(300):
+        status = nav.step()
+        if status == "arrived":
+            break
+        assert grid.is_free(nav.position)
+        if status == "waiting":
+            assert flat.find_path(nav.position) is None
+    assert nav.position == goal
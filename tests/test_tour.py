@@ -0,0 +1,61 @@
+import itertools
+import random
+from collections import deque
+
+from navigation import ARRIVED, Grid, Navigator, make_planner
+from navigation.grid import TARGET
+
+
+def steps_from(grid, source):
+    dist = {source: 0}
+    queue = deque([source])
+    while queue:
+        u = queue.popleft()
+        for v in grid.neighbors(u):
+            if v not in dist:
+                dist[v] = dist[u] + 1
+                queue.append(v)
+    return dist
+
+
+def visit_cells(grid, waypoint):
+    return grid.neighbors(waypoint) if grid.cells[waypoint] & TARGET else [waypoint]
+
+
+def test_tour_carries_on_past_the_goal():
+    grid = Grid(1, 5, goal=(0, 2))
+    nav = Navigator(grid, make_planner("tour", grid, waypoints=[(0, 4)]), (0, 0))
+    trail = [nav.position]
+    while nav.step() != ARRIVED:
+        trail.append(nav.position)
+        assert len(trail) < 20
+    assert (0, 4) in trail
+    assert trail[-1] == (0, 2)
+
+
+def test_legs_cost_what_is_driven():
+    # Buoys are visited from a cell beside them; the route must cost no more
+    # than the best choice of those cells for the order the planner picked.
+    for seed in range(40):
+        rng = random.Random(seed)
+        grid = Grid.generate(12, 30, 0, (0, 0), (11, 11), rng)
+        cells = [(r, c) for r in range(12) for c in range(12) if (r, c) not in ((0, 0), (11, 11))]
+        waypoints = rng.sample(cells, 4)
+        planner = make_planner("tour", grid, waypoints=waypoints)
+        path = planner.find_path((0, 0))
+        if path is None:
+            continue
+        for (ar, ac), (br, bc) in zip(path, path[1:]):
+            assert abs(ar - br) + abs(ac - bc) == 1 and grid.is_free((br, bc))
+        assert path[-1] == (11, 11)
+        for waypoint in waypoints:
+            assert any(cell in path for cell in visit_cells(grid, waypoint))
+        tables = {}
+        best = None
+        groups = [visit_cells(grid, waypoints[i]) for i in planner.order]
+        for choice in itertools.product(*groups):
+            stops = [(0, 0), *choice, (11, 11)]
+            legs = [tables.setdefault(a, steps_from(grid, a)).get(b) for a, b in zip(stops, stops[1:])]
+            if None not in legs and (best is None or sum(legs) < best):
+                best = sum(legs)
+        assert len(path) - 1 == best